@@ -59,6 +59,9 @@ class EvaluationSummary(BaseModel):
     average_impact_value: float
     average_presentation_demo_quality: float
     average_team_collaboration: float
+    # Running sums maintained with $inc; averages are derived on read
+    sum_total_score: float = 0.0
+    sum_scores: Dict[str, float] = {}
     last_updated: datetime
 
 class JudgeEvaluationHistory(BaseModel):
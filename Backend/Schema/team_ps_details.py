@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+# === Pydantic Schemas ===
+
+class TeamPSMember(BaseModel):
+    name: str
+    roll_no: str
+    email: str
+    contact: str
+    role: str = "Member"
+
+class ProblemStatementDetails(BaseModel):
+    ps_id: str
+    title: str
+    description: str
+    category: str
+    difficulty: str
+    domain: str
+
+class TeamPSDetails(BaseModel):
+    team_id: str = Field(..., description="Unique team identifier")
+    team_name: str = Field(..., description="Name of the team")
+    college: str
+    department: str
+    year: str
+    team_leader: TeamPSMember
+    team_members: List[TeamPSMember] = []
+    problem_statement: ProblemStatementDetails
+    mentor: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = "active"
+
+class ExcelUploadResponse(BaseModel):
+    message: str
+    teams_processed: int
+    teams_saved: int
+    errors: List[str] = []
+    dry_run: bool = False
+    diff: Optional[Dict[str, Any]] = Field(None, description="inserts/updates/deletes/unchanged")
+    timings: List[Dict[str, Any]] = Field([], description="Queue wait and run time of each background job")
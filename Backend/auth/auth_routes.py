@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from bson import ObjectId
@@ -11,33 +10,17 @@ from typing import Optional
 from Schema.judge import JudgeLogin, JudgeModel, JudgeResponse
 from utils.hash_password import verify_password, get_password_hash
 from jose import JWTError, jwt
-from db.mongo import db  # Use the main database connection
-import os
-
-print(MONGO_DB)
-MONGO_URI = os.getenv("MONGODB_URI")
-print(MONGO_URI)
+from db.mongo import get_database, get_db  # Shared process-wide client
 
 router = APIRouter()
 
-# Initialize collection variables
-logins_collection = None
-admin_collection = None
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def check_db_connection():
-    """Check if database connection is available"""
-    if db is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Database is not available. Please check MongoDB connection."
-        )
-
 @router.get("/health")
 async def health_check():
     """Check database connection health"""
     try:
+        db = get_database()
         if db is not None:
             await db.command('ping')
             return {"status": "healthy", "database": "connected"}
@@ -46,47 +29,10 @@ async def health_check():
     except Exception as e:
         return {"status": "unhealthy", "database": "error", "message": str(e)}
 
-@router.on_event("startup")
-async def startup_db_client():
-    global client, db, logins_collection, admin_collection, teams_meta
-    try:
-        # Connect with increased timeout and retry settings
-        client = AsyncIOMotorClient(
-            MONGO_URI,
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=30000,
-            retryWrites=True,
-            maxPoolSize=50
-        )
-        # Test the connection
-        await client.admin.command('ping')
-        print("Successfully connected to MongoDB!")
-
-        # Initialize database and collections
-        db = client[MONGO_DB]
-        logins_collection = db["team_login"]
-        teams_meta = db["teams_meta"]
-        admin_collection = db["admin_users"]
-
-        # Create indexes for better performance
-        await admin_collection.create_index("email", unique=True)
-        await logins_collection.create_index("email", unique=True)
-
-    except Exception as e:
-        print(f"Warning: Failed to connect to MongoDB: {str(e)}")
-        print("Application will start but database operations will fail until MongoDB is available.")
-        # Don't raise exception - let the app start
-        client = None
-        db = None
-        logins_collection = None
-        teams_meta = None
-        admin_collection = None
-
 @router.post("/judge/login")
-async def judge_login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def judge_login(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(get_db)):
     """Authenticate judge and return JWT token"""
     try:
-        check_db_connection()
         print("kese ho")
         print("none one: ", form_data.username, form_data.password)
         # Look for judge by username instead of email
@@ -126,10 +72,9 @@ async def judge_login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
 
 @router.post("/judge/register", response_model=JudgeResponse)
-async def register_judge(judge: JudgeModel):
+async def register_judge(judge: JudgeModel, db = Depends(get_db)):
     """Register a new judge"""
     try:
-        check_db_connection()
         # Check if judge already exists
         if await db.judges.find_one({"email": judge.email}):
             raise HTTPException(
@@ -171,7 +116,7 @@ class AdminCreate(BaseModel):
     name: str
     role: str = "admin"
 
-async def get_current_admin(token: str = Depends(oauth2_scheme)):
+async def get_current_admin(token: str = Depends(oauth2_scheme), db = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -191,19 +136,18 @@ async def get_current_admin(token: str = Depends(oauth2_scheme)):
     except:
         raise credentials_exception
 
-    admin = await admin_collection.find_one({"email": email})
+    admin = await db["admin_users"].find_one({"email": email})
     if admin is None:
         raise credentials_exception
     return admin
 
 @router.post("/admin/create")
-async def create_admin(admin: AdminCreate):
+async def create_admin(admin: AdminCreate, db = Depends(get_db)):
     try:
-        check_db_connection()
         print(f"Creating admin user with email: {admin.email}")
 
         # Check if admin already exists
-        existing_admin = await admin_collection.find_one({"email": admin.email})
+        existing_admin = await db["admin_users"].find_one({"email": admin.email})
         if existing_admin:
             raise HTTPException(
                 status_code=400,
@@ -215,7 +159,7 @@ async def create_admin(admin: AdminCreate):
         admin_dict["password"] = admin.password
         admin_dict["created_at"] = datetime.utcnow()
 
-        result = await admin_collection.insert_one(admin_dict)
+        result = await db["admin_users"].insert_one(admin_dict)
         print(f"Admin user created with ID: {result.inserted_id}")
 
         return {"message": "Admin created successfully", "admin_id": str(result.inserted_id)}
@@ -228,9 +172,9 @@ async def create_admin(admin: AdminCreate):
         )
 
 @router.post("/admin/login")
-async def admin_login(payload: LoginRequest):
+async def admin_login(payload: LoginRequest, db = Depends(get_db)):
     print(f"Admin login attempt for email: {payload.email}")
-    admin = await admin_collection.find_one({"email": payload.email})
+    admin = await db["admin_users"].find_one({"email": payload.email})
     if not admin:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -254,17 +198,7 @@ async def admin_login(payload: LoginRequest):
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/team_login/")
-async def team_login(payload: LoginRequest):
-    # Ensure db is initialized
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
-
-    # Find user in team_login collection
-    user = await db["team_login"].find_one({"email": payload.email})
-    # Ensure db is initialized
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
-
+async def team_login(payload: LoginRequest, db = Depends(get_db)):
     # Find user in team_login collection
     user = await db["team_login"].find_one({"email": payload.email})
     if not user:
@@ -1,5 +1,6 @@
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import HTTPException
 from pymongo.errors import ConnectionFailure, OperationFailure
 from dotenv import load_dotenv
 import asyncio
@@ -10,6 +11,11 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "hackathon_evaluation")
 
+# Connection pool tuning for the single process-wide client
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+
 client = None
 db = None
 
@@ -21,7 +27,14 @@ async def connect_to_mongo():
             print("❌ MONGODB_URI environment variable not set")
             return False
             
-        client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        client = AsyncIOMotorClient(
+            MONGO_URI,
+            serverSelectionTimeoutMS=5000,
+            retryWrites=True,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS
+        )
         
         # Test the connection
         await client.admin.command('ping')
@@ -61,6 +74,13 @@ async def get_database_async():
             return None
     return db
 
+async def get_db():
+    """FastAPI dependency: the shared database handle, or 500 if unavailable"""
+    db = await get_database_async()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    return db
+
 
 
 
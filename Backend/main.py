@@ -10,9 +10,20 @@ from routes.leaderboard import router as leaderboard_router
 from routes.team_ps_upload import router as team_ps_router
 from routes.round_state import router as round_state_router
 from routes.ppt_upload import router as ppt_upload_router
+from routes.jobs import router as jobs_router
+from routes.events import router as events_router
 from datetime import datetime
 from contextlib import asynccontextmanager
-from db.mongo import connect_to_mongo, close_mongo_connection, get_database_async
+from db.mongo import connect_to_mongo, close_mongo_connection, get_database_async, get_database
+from db.indexes import ensure_indexes
+from utils.executors import shutdown_executors
+from utils.jobs import fail_interrupted_jobs
+from utils.upload_buffer import reject_oversized_uploads
+from utils.leaderboard_engine import load_evaluation_boards
+from utils.active_round import start_active_round_watcher, stop_active_round_watcher
+from utils.broadcaster import start_event_relay, stop_event_relay
+from utils.ppt_leaderboard import load_board
+from Schema.evaluation import get_evaluation_summary_collection
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -20,12 +31,28 @@ async def lifespan(app: FastAPI):
     success = await connect_to_mongo()
     if success:
         print("✅ Database connection established during startup")
+        await ensure_indexes(get_database())
+        await fail_interrupted_jobs(get_database())
+        # Warm the in-memory leaderboards so the first readers don't hit Mongo
+        try:
+            await load_board(get_database())
+            teams = await load_evaluation_boards(get_evaluation_summary_collection())
+            print(f"✅ Leaderboards loaded into memory ({teams} evaluated team-rounds)")
+        except Exception as e:
+            print(f"⚠️ Could not preload leaderboards: {e}")
+        # Keep the cached active round in step with changes made by other workers
+        start_active_round_watcher(get_database())
+        # Deliver leaderboard events published by any worker to this worker's /events clients
+        start_event_relay(get_database())
     else:
         print("⚠️ Database connection failed during startup")
     
     yield
     
     # Shutdown
+    await stop_active_round_watcher()
+    await stop_event_relay()
+    shutdown_executors()
     await close_mongo_connection()
     print("✅ MongoDB connection closed during shutdown")
 
@@ -44,6 +71,10 @@ origin = [
     "http://localhost:5174"
 ]
 
+# Reject oversized uploads from their Content-Length; registered before CORS
+# so the 413 still carries CORS headers
+app.middleware("http")(reject_oversized_uploads)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +95,8 @@ app.include_router(team_ps_router, prefix="/team-ps", tags=["Team and Problem St
 app.include_router(ppt_upload_router, tags=["PPT Upload"])
 app.include_router(leaderboard_router)
 app.include_router(round_state_router)
+app.include_router(jobs_router)
+app.include_router(events_router)
 
 @app.get("/")
 async def root():
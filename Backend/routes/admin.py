@@ -502,7 +502,11 @@ from bson import ObjectId
 import logging
 from fastapi.responses import JSONResponse
 
-from db.mongo import get_database_async
+from db.mongo import get_db
+from db.indexes import verify_query_plans
+from utils.team_roster import rebuild_team_roster
+from utils.executors import executor_stats
+from utils.broadcaster import broadcaster
 from auth.auth_routes import get_current_admin
 from Schema.admin_schema import (
     AdminDashboardStats,
@@ -522,13 +526,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["admin"])
 
-# Database dependency
-async def get_db():
-    db = await get_database_async()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    return db
-
 # Utility functions for common operations
 async def check_exists(db, collection: str, query: Dict[str, Any]) -> bool:
     """Check if a document exists in the given collection"""
@@ -1024,4 +1021,61 @@ async def debug_round_creation(
             "status": "error",
             "message": f"Validation failed: {str(e)}",
             "error_details": str(e)
-        }
\ No newline at end of file
+        }
+
+# Index health
+@router.get("/indexes/verify")
+async def verify_indexes(current_admin = Depends(get_current_admin), db = Depends(get_db)):
+    """
+    Explain every registered query shape and flag any that fall back to a
+    collection scan, so missing indexes are caught before event day.
+    """
+    try:
+        plans = await verify_query_plans(db)
+        collscans = [p for p in plans if p["collscan"]]
+        return {
+            "status": "ok" if not collscans else "collscan_detected",
+            "checked": len(plans),
+            "collscans": len(collscans),
+            "plans": plans
+        }
+    except Exception as e:
+        logger.error(f"Error verifying query plans: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to verify query plans: {str(e)}"
+        )
+
+# Judge team roster
+@router.post("/team-roster/rebuild")
+async def rebuild_judge_team_roster(current_admin = Depends(get_current_admin), db = Depends(get_db)):
+    """
+    Re-materialize the judge team roster after FinalTeamandpsdetails changes.
+    """
+    try:
+        result = await rebuild_team_roster(db)
+        logger.info(f"Team roster rebuilt by {current_admin['email']}: {result['count']} teams")
+        return {"message": "Team roster rebuilt", **result}
+    except Exception as e:
+        logger.error(f"Error rebuilding team roster: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to rebuild team roster: {str(e)}"
+        )
+
+# Upload executors
+@router.get("/executors/stats")
+async def get_executor_stats(current_admin = Depends(get_current_admin)):
+    """
+    Pool sizes, in-flight jobs and recent queue wait / run times of the
+    upload executors.
+    """
+    return {"executors": executor_stats()}
+
+# Live event channel
+@router.get("/events/stats")
+async def get_event_stats(current_admin = Depends(get_current_admin)):
+    """
+    Connected /events subscribers and events published by this worker.
+    """
+    return {"events": broadcaster.stats()}
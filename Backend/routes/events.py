@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from utils.broadcaster import broadcaster
+
+# Topics published on the live channel
+EVENT_TOPICS = {"leaderboard", "evaluation_leaderboard", "active_round"}
+
+router = APIRouter(tags=["Live Events"])
+
+
+@router.get("/events")
+async def stream_events(request: Request, topics: Optional[str] = None):
+    """
+    Server-sent events: leaderboard deltas and active-round changes.
+    Pass topics=leaderboard,active_round to subscribe to a subset. On a
+    "resync" event the client should re-fetch the full state.
+    """
+    wanted = {t.strip() for t in topics.split(",")} & EVENT_TOPICS if topics else None
+    subscription = broadcaster.subscribe(wanted or None)
+    return StreamingResponse(
+        broadcaster.stream(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from db.mongo import get_db
+from utils.jobs import get_job
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str                      # queued | running | completed | failed
+    meta: Dict[str, Any] = {}
+    progress: Dict[str, Any] = {}
+    errors: List[str] = []
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, db = Depends(get_db)):
+    """
+    Progress, row counts and errors of a background upload or rebuild job.
+    Poll until status is "completed" or "failed".
+    """
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["job_id"] = job.pop("_id")
+    return job
@@ -1,18 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header, Response
+from fastapi.responses import JSONResponse
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
-from db.mongo import db
+from db.mongo import get_db
 from Schema.judge import JudgeModel, JudgeEvaluation, JudgeResponse, JudgeFeedback
 from Schema.team_meta import TeamMeta
 from auth.auth_middleware import get_current_judge
+from utils.team_roster import get_team_roster, query_team_roster, parse_roster_fields, etag_matches
 
 router = APIRouter()
 
+# Only the fields the judge panel renders for an assigned team
+TEAM_META_PROJECTION = {field: 1 for field in TeamMeta.__fields__}
+
 
 # ------------------ 👤 Judge Profile ------------------
 @router.get("/profile", response_model=JudgeResponse)
-async def get_judge_profile(current_judge = Depends(get_current_judge)):
+async def get_judge_profile(current_judge = Depends(get_current_judge), db = Depends(get_db)):
     """Get the current judge's profile"""
     try:
         judge = await db.judges.find_one({"_id": ObjectId(current_judge["id"])})
@@ -45,7 +50,8 @@ async def get_judge_profile(current_judge = Depends(get_current_judge)):
 @router.get("/assigned-teams")
 async def get_assigned_teams(
     round_id: Optional[int] = None,
-    current_judge = Depends(get_current_judge)
+    current_judge = Depends(get_current_judge),
+    db = Depends(get_db)
 ):
     """Get teams assigned to the judge for evaluation"""
     try:
@@ -57,77 +63,82 @@ async def get_assigned_teams(
         if not assignments or not assignments.get("assigned_teams"):
             return {"teams": []}
             
-        teams = []
+        # One $in round trip for all assigned teams, projected down to TeamMeta fields
+        team_ids = []
         for team_id in assignments["assigned_teams"]:
-            team = await db.teams.find_one({"_id": ObjectId(team_id)})
-            if team:
-                teams.append(TeamMeta(**team).dict())
+            if ObjectId.is_valid(team_id):
+                team_ids.append(ObjectId(team_id))
+            else:
+                print(f"⚠️ Skipping invalid team id {team_id!r} assigned to judge {current_judge['id']}")
+        by_id = {}
+        async for team in db.teams.find({"_id": {"$in": team_ids}}, TEAM_META_PROJECTION):
+            by_id[team["_id"]] = team
+
+        # $in does not preserve order, so re-walk the assignment list
+        teams = [TeamMeta(**by_id[team_id]).dict() for team_id in team_ids if team_id in by_id]
         return {"teams": teams}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ------------------ 👥 All Teams ------------------
 @router.get("/all-teams")
-async def get_all_teams(current_judge = Depends(get_current_judge)):
-    """Get all teams with their problem statement details for judges to view"""
+async def get_all_teams(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; enables paged response"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. team_id,team_name,problem_statement.title"),
+    category: Optional[str] = Query(None, description="Filter by problem statement category"),
+    ps_id: Optional[str] = Query(None, description="Filter by problem statement ID"),
+    if_none_match: Optional[str] = Header(None),
+    current_judge = Depends(get_current_judge),
+    db = Depends(get_db)
+):
+    """
+    Get all teams with their problem statement details for judges to view.
+    Without query parameters the full roster is returned as a list; any of
+    limit/cursor/fields/category/ps_id switches to a paged, filtered response.
+    """
     try:
-        # Fetch from FinalTeamandpsdetails collection instead of team_ps_details
-        teams = await db.FinalTeamandpsdetails.find({}).to_list(None)
-        
-        # Transform the data to match the expected frontend structure
-        transformed_teams = []
-        for team in teams:
-            # Create team members array from individual member fields
-            team_members = []
-            for i in range(1, 6):  # Check for members 1-5
-                member_name = team.get(f'Team member-{i} name')
-                if member_name and str(member_name).strip() and str(member_name).lower() != 'nan':
-                    team_members.append({
-                        "name": str(member_name).strip(),
-                        "roll_no": "N/A",
-                        "email": "N/A", 
-                        "contact": "N/A",
-                        "role": f"Member {i}"
-                    })
-            
-            # Create problem statement object
-            problem_statement = {
-                "ps_id": str(team.get('PSID', 'N/A')),
-                "title": str(team.get('Problem Statement Name', 'N/A')),
-                "description": str(team.get('Problem Statement Description as it is in SIH Website', 'N/A')),
-                "category": str(team.get('Select Category ', 'N/A')),
-                "difficulty": "N/A",
-                "domain": "N/A"
-            }
-            
-            # Create transformed team object
-            transformed_team = {
-                "team_id": str(team.get('Team ID', 'N/A')),
-                "team_name": str(team.get('Team Name', 'N/A')),
-                "college": "GLA University",  # Default since not in FinalTeamandpsdetails
-                "department": "N/A",
-                "year": "N/A",
-                "team_leader": {
-                    "name": str(team.get('Team Leader Name', 'N/A')),
-                    "roll_no": str(team.get('University Roll No', 'N/A')),
-                    "email": str(team.get('Team Leader Email id (gla email id only)', 'N/A')),
-                    "contact": str(team.get('Team Leader Contact No.', 'N/A')),
-                    "role": "Team Leader"
-                },
-                "team_members": team_members,
-                "problem_statement": problem_statement,
-                "mentor": None,
-                "status": "active"
-            }
-            
-            transformed_teams.append(transformed_team)
-        
-        # Convert ObjectId to string for JSON serialization
-        for team in transformed_teams:
-            if "_id" in team:
-                team["_id"] = str(team["_id"])
-        
-        return transformed_teams
+        # Served from the materialized roster; repeat loads revalidate with ETag
+        teams, etag = await get_team_roster(db)
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+
+        if all(param is None for param in (limit, cursor, fields, category, ps_id)):
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return JSONResponse(content=teams, headers=headers)
+
+        try:
+            projection = parse_roster_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Cursor is "<roster version>:<last position>" so paging never mixes two uploads
+        after = None
+        if cursor is not None:
+            version, _, position = cursor.rpartition(":")
+            if not version or not position.isdigit():
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            if version != etag:
+                # The cursor may come from a worker that already saw a newer roster
+                teams, etag = await get_team_roster(db, refresh=True)
+                headers["ETag"] = f'"{etag}"'
+            if version != etag:
+                raise HTTPException(status_code=status.HTTP_410_GONE, detail="Team roster changed, restart paging")
+            after = int(position)
+
+        page, last_position = await query_team_roster(
+            db, etag, category=category, ps_id=ps_id, after=after,
+            limit=limit or 50, projection=projection
+        )
+        return JSONResponse(
+            content={
+                "teams": page,
+                "next_cursor": f"{etag}:{last_position}" if last_position is not None else None
+            },
+            headers=headers
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -137,7 +148,8 @@ async def get_all_teams(current_judge = Depends(get_current_judge)):
 async def submit_evaluation(
     team_id: str,
     evaluation: JudgeEvaluation,
-    current_judge = Depends(get_current_judge)
+    current_judge = Depends(get_current_judge),
+    db = Depends(get_db)
 ):
     """Submit evaluation scores and feedback for a team"""
     try:
@@ -185,32 +197,62 @@ async def submit_evaluation(
 async def get_evaluations(
     round_id: Optional[int] = None,
     team_id: Optional[str] = None,
-    current_judge = Depends(get_current_judge)
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; enables paged response"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_judge = Depends(get_current_judge),
+    db = Depends(get_db)
 ):
-    """View submitted evaluations by the judge"""
+    """
+    View submitted evaluations by the judge. Without limit/cursor every
+    evaluation is returned; either one switches to newest-first pages.
+    """
     try:
+        paged = limit is not None or cursor is not None
+        limit = limit or 50
         query = {"judge_id": current_judge["id"]}
         if round_id is not None:
             query["round_id"] = round_id
         if team_id is not None:
             query["team_id"] = team_id
-            
+        if cursor is not None:
+            if not ObjectId.is_valid(cursor):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query["_id"] = {"$lt": ObjectId(cursor)}
+
+        if paged:
+            # Fetch one extra document to know whether another page exists
+            feedback = await db.judge_feedback.find(query).sort("_id", -1).limit(limit + 1).to_list(None)
+            has_more = len(feedback) > limit
+            feedback = feedback[:limit]
+        else:
+            feedback = await db.judge_feedback.find(query).to_list(None)
+
+        # Prefetch every referenced team in one $in query and join in memory
+        team_ids = {ObjectId(f["team_id"]) for f in feedback if ObjectId.is_valid(f["team_id"])}
+        team_names = {}
+        async for team in db.teams.find({"_id": {"$in": list(team_ids)}}, {"team_name": 1}):
+            team_names[str(team["_id"])] = team.get("team_name")
+
         evaluations = []
-        async for eval in db.judge_feedback.find(query):
-            team = await db.teams.find_one({"_id": ObjectId(eval["team_id"])})
-            if team:
-                eval_data = {
-                    "feedback_id": eval["feedback_id"],
-                    "team_id": eval["team_id"],
-                    "team_name": team.get("team_name"),
-                    "round_id": eval["round_id"],
-                    "comments": eval["comments"],
-                    "rating": eval["rating"],
-                    "detailed_scores": eval.get("detailed_scores", {}),
-                    "submitted_at": eval["submitted_at"]
-                }
-                evaluations.append(eval_data)
-                
-        return {"evaluations": evaluations}
+        for eval in feedback:
+            if eval["team_id"] not in team_names:
+                continue
+            evaluations.append({
+                "feedback_id": eval["feedback_id"],
+                "team_id": eval["team_id"],
+                "team_name": team_names[eval["team_id"]],
+                "round_id": eval["round_id"],
+                "comments": eval["comments"],
+                "rating": eval["rating"],
+                "detailed_scores": eval.get("detailed_scores", {}),
+                "submitted_at": eval["submitted_at"]
+            })
+
+        if not paged:
+            return {"evaluations": evaluations}
+        next_cursor = str(feedback[-1]["_id"]) if has_more else None
+        return {"evaluations": evaluations, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,12 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from datetime import datetime
+from pymongo import ReturnDocument, DeleteMany
+from pymongo.errors import DuplicateKeyError
 import uuid
 
 # ✅ Use the collection getter functions instead of direct imports
 from Schema.evaluation import (
-    TeamEvaluation, 
-    JudgeEvaluationScore, 
+    TeamEvaluation,
+    JudgeEvaluationScore,
     EvaluationSummary,
     JudgeEvaluationHistory,
     get_team_evaluations_collection,
@@ -16,10 +18,28 @@ from Schema.evaluation import (
 )
 from Schema.judge import JudgeModel
 from auth.auth_middleware import get_current_judge
+from auth.auth_routes import get_current_admin
+from db.indexes import INDEX_REGISTRY
+from utils.leaderboard_engine import (
+    apply_evaluation_summary, get_evaluation_board, invalidate_evaluation_boards
+)
+from utils.broadcaster import relay_event
 
 router = APIRouter(tags=["Judge Evaluation"])
 security = HTTPBearer()
 
+# Rubric weights (percent) for the 8 judging criteria
+EVALUATION_WEIGHTS = {
+    "problem_solution_fit": 10,
+    "functionality_features": 20,
+    "technical_feasibility": 20,
+    "innovation_creativity": 15,
+    "user_experience": 15,
+    "impact_value": 10,
+    "presentation_demo_quality": 5,
+    "team_collaboration": 5,
+}
+
 # ==================== EVALUATION CRUD OPERATIONS ====================
 
 @router.post("/submit", response_model=dict)
@@ -30,7 +50,7 @@ async def submit_evaluation(
     try:
         current_judge = await get_current_judge(credentials.credentials)
         evaluation_id = str(uuid.uuid4())
-        
+
         scores = JudgeEvaluationScore(
             problem_solution_fit=float(evaluation_data.get("problem_solution_fit", 5)),
             functionality_features=float(evaluation_data.get("functionality_features", 5)),
@@ -41,18 +61,9 @@ async def submit_evaluation(
             presentation_demo_quality=float(evaluation_data.get("presentation_demo_quality", 5)),
             team_collaboration=float(evaluation_data.get("team_collaboration", 5))
         )
-        
-        weights = {
-            "problem_solution_fit": 10,
-            "functionality_features": 20,
-            "technical_feasibility": 20,
-            "innovation_creativity": 15,
-            "user_experience": 15,
-            "impact_value": 10,
-            "presentation_demo_quality": 5,
-            "team_collaboration": 5,
-        }
-        
+
+        weights = EVALUATION_WEIGHTS
+
         raw_scores = [
             scores.problem_solution_fit,
             scores.functionality_features,
@@ -63,7 +74,7 @@ async def submit_evaluation(
             scores.presentation_demo_quality,
             scores.team_collaboration,
         ]
-        
+
         average_score = sum(raw_scores) / 8
         total_score = (
             scores.problem_solution_fit * weights["problem_solution_fit"] +
@@ -75,7 +86,7 @@ async def submit_evaluation(
             scores.presentation_demo_quality * weights["presentation_demo_quality"] +
             scores.team_collaboration * weights["team_collaboration"]
         ) / 10.0
-        
+
         evaluation = TeamEvaluation(
             evaluation_id=evaluation_id,
             judge_id=current_judge["id"],
@@ -92,44 +103,336 @@ async def submit_evaluation(
             evaluated_at=datetime.utcnow(),
             submitted_at=datetime.utcnow()
         )
-        
+
         # ✅ Use the collection getter function
         team_evaluations_collection = get_team_evaluations_collection()
-        result = await team_evaluations_collection.insert_one(evaluation.dict())
-        
-        if result.inserted_id:
-            await update_evaluation_summary(evaluation.team_id, evaluation.round_id)
-            return {
-                "success": True,
-                "message": "Evaluation submitted successfully",
-                "evaluation_id": evaluation_id,
-                "total_score": total_score,
-                "average_score": average_score
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save evaluation")
-            
+
+        # One evaluation per (judge, team, round): a resubmission edits the
+        # existing document, and we keep the previous version to compute the delta.
+        evaluation_doc = evaluation.dict()
+        evaluation_doc.pop("evaluation_id")
+        upsert_args = (
+            {
+                "judge_id": evaluation.judge_id,
+                "team_id": evaluation.team_id,
+                "round_id": evaluation.round_id
+            },
+            {"$set": evaluation_doc, "$setOnInsert": {"evaluation_id": evaluation_id}},
+        )
+        try:
+            previous = await team_evaluations_collection.find_one_and_update(
+                *upsert_args, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            # A concurrent submit (e.g. a double-click) inserted first; the
+            # unique index stopped a second copy, so this one becomes an edit
+            previous = await team_evaluations_collection.find_one_and_update(
+                *upsert_args, upsert=True, return_document=ReturnDocument.BEFORE
+            )
+        if previous:
+            evaluation_id = previous["evaluation_id"]
+
+        new_doc = {**evaluation_doc, "evaluation_id": evaluation_id}
+        old_doc = previous if previous and previous.get("evaluation_status") == "submitted" else None
+        await apply_evaluation_to_summary(new=new_doc, old=old_doc)
+        return {
+            "success": True,
+            "message": "Evaluation updated successfully" if old_doc else "Evaluation submitted successfully",
+            "evaluation_id": evaluation_id,
+            "total_score": total_score,
+            "average_score": average_score
+        }
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting evaluation: {str(e)}")
 
-# ... (rest of the routes, update all collection references to use the getter functions)
-
-async def update_evaluation_summary(team_id: str, round_id: int):
-    """Update evaluation summary for a team after new evaluation is submitted"""
+@router.post("/withdraw/{evaluation_id}", response_model=dict)
+async def withdraw_evaluation(
+    evaluation_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Withdraw a submitted evaluation and remove it from the team summary"""
     try:
+        current_judge = await get_current_judge(credentials.credentials)
         team_evaluations_collection = get_team_evaluations_collection()
+
+        # Conditional on status so a double withdraw only decrements once
+        previous = await team_evaluations_collection.find_one_and_update(
+            {
+                "evaluation_id": evaluation_id,
+                "judge_id": current_judge["id"],
+                "evaluation_status": "submitted"
+            },
+            {"$set": {"evaluation_status": "withdrawn", "withdrawn_at": datetime.utcnow()}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous:
+            raise HTTPException(status_code=404, detail="No submitted evaluation found to withdraw")
+
+        await apply_evaluation_to_summary(new=None, old=previous)
+        return {
+            "success": True,
+            "message": "Evaluation withdrawn successfully",
+            "evaluation_id": evaluation_id
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error withdrawing evaluation: {str(e)}")
+
+@router.get("/summary/{team_id}", response_model=dict)
+async def get_team_evaluation_summary(
+    team_id: str,
+    round_id: int = 1
+):
+    """Get evaluation summary for a team (aggregated scores from all judges)"""
+    try:
         evaluation_summary_collection = get_evaluation_summary_collection()
-        
-        evaluations = list(await team_evaluations_collection.find({
+        summary = await evaluation_summary_collection.find_one({
             "team_id": team_id,
-            "round_id": round_id,
-            "evaluation_status": "submitted"
-        }).to_list(None))
-        
-        if not evaluations:
+            "round_id": round_id
+        })
+
+        if summary and summary.get("total_evaluations", 0) > 0:
+            summary["_id"] = str(summary["_id"])
+            summary["last_updated"] = summary["last_updated"].isoformat()
+            return summary_with_averages(summary)
+        else:
+            return {"message": "No evaluation summary found for this team"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching evaluation summary: {str(e)}")
+
+# ==================== HELPER FUNCTIONS ====================
+
+def _summary_sums(evaluation: Optional[dict]) -> dict:
+    """Flatten one evaluation into the summary's running-sum fields"""
+    if not evaluation:
+        return {"sum_total_score": 0.0, **{f"sum_scores.{c}": 0.0 for c in EVALUATION_WEIGHTS}}
+    sums = {"sum_total_score": float(evaluation["total_score"])}
+    for criterion in EVALUATION_WEIGHTS:
+        sums[f"sum_scores.{criterion}"] = float(evaluation["scores"][criterion])
+    return sums
+
+async def apply_evaluation_to_summary(new: Optional[dict] = None, old: Optional[dict] = None):
+    """
+    Fold one evaluation change into the running (team_id, round_id) summary.
+    new only -> first submission, new and old -> edit, old only -> withdrawal.
+    The whole change is a single atomic $inc, independent of how many
+    evaluations the team already has.
+    """
+    try:
+        evaluation = new or old
+        if evaluation is None:
             return
-        
-        # ... (rest of the function remains the same)
-        
+
+        new_sums = _summary_sums(new)
+        old_sums = _summary_sums(old)
+        increments = {key: new_sums[key] - old_sums[key] for key in new_sums}
+        increments["total_evaluations"] = (1 if new else 0) - (1 if old else 0)
+
+        evaluation_summary_collection = get_evaluation_summary_collection()
+        summary = await evaluation_summary_collection.find_one_and_update(
+            {"team_id": evaluation["team_id"], "round_id": evaluation["round_id"]},
+            {
+                "$inc": increments,
+                "$set": {"team_name": evaluation["team_name"], "last_updated": datetime.utcnow()}
+            },
+            projection={"_id": 0, "sum_scores": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # Move the team on the in-memory round leaderboard and push the change to live clients of every worker
+        await relay_event("evaluation_leaderboard", apply_evaluation_summary(summary))
+
+    except Exception as e:
+        print(f"Error updating evaluation summary: {str(e)}")
+
+def summary_with_averages(summary: dict) -> dict:
+    """Derive the EvaluationSummary average_* fields from the stored running sums"""
+    count = summary.get("total_evaluations", 0)
+    sum_scores = summary.get("sum_scores", {})
+
+    def average(value: float) -> float:
+        return round(value / count, 2) if count else 0.0
+
+    summary["average_total_score"] = average(summary.get("sum_total_score", 0.0))
+    for criterion in EVALUATION_WEIGHTS:
+        summary[f"average_{criterion}"] = average(sum_scores.get(criterion, 0.0))
+    return summary
+
+async def dedupe_team_evaluations(round_id: Optional[int] = None, apply: bool = True) -> int:
+    """
+    Collapse evaluations stored more than once for the same (judge, team,
+    round), from before the unique index existed. The latest submitted copy
+    is kept (the latest copy when none was submitted); with apply=True the
+    others are deleted and the unique index is created. Returns the number
+    of surplus copies.
+    """
+    team_evaluations_collection = get_team_evaluations_collection()
+    match = {} if round_id is None else {"round_id": round_id}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"submitted_at": -1, "evaluated_at": -1}},
+        {"$group": {
+            "_id": {"judge_id": "$judge_id", "team_id": "$team_id", "round_id": "$round_id"},
+            "copies": {"$push": {"_id": "$_id", "status": "$evaluation_status"}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    surplus = []
+    async for group in team_evaluations_collection.aggregate(pipeline, allowDiskUse=True):
+        copies = group["copies"]
+        keep = next((c for c in copies if c["status"] == "submitted"), copies[0])
+        surplus.extend(c["_id"] for c in copies if c is not keep)
+
+    if apply:
+        operations = [DeleteMany({"_id": {"$in": surplus[start:start + 500]}})
+                      for start in range(0, len(surplus), 500)]
+        if operations:
+            await team_evaluations_collection.bulk_write(operations, ordered=False)
+            print(f"🧹 Removed {len(surplus)} duplicate evaluations")
+        if round_id is None:
+            # No duplicates are left, so the unique index can be built now
+            await team_evaluations_collection.create_indexes(INDEX_REGISTRY["team_evaluations"])
+    return len(surplus)
+
+async def rebuild_evaluation_summaries(round_id: Optional[int] = None, apply: bool = True) -> dict:
+    """
+    Recompute every summary from the submitted evaluations and compare it with
+    the running sums. Duplicate evaluations are collapsed first (and counted
+    once either way); with apply=True drifted or missing summaries are overwritten.
+    """
+    team_evaluations_collection = get_team_evaluations_collection()
+    evaluation_summary_collection = get_evaluation_summary_collection()
+
+    duplicates = await dedupe_team_evaluations(round_id=round_id, apply=apply)
+
+    match = {"evaluation_status": "submitted"}
+    if round_id is not None:
+        match["round_id"] = round_id
+
+    # Latest submitted copy per (judge, team, round), the one deduping keeps
+    latest = [
+        {"$match": match},
+        {"$sort": {"submitted_at": -1, "evaluated_at": -1}},
+        {"$group": {
+            "_id": {"judge_id": "$judge_id", "team_id": "$team_id", "round_id": "$round_id"},
+            "doc": {"$first": "$$ROOT"}
+        }},
+        {"$replaceRoot": {"newRoot": "$doc"}}
+    ]
+
+    group = {
+        "_id": {"team_id": "$team_id", "round_id": "$round_id"},
+        "team_name": {"$last": "$team_name"},
+        "total_evaluations": {"$sum": 1},
+        "sum_total_score": {"$sum": "$total_score"},
+    }
+    for criterion in EVALUATION_WEIGHTS:
+        group[f"sum_{criterion}"] = {"$sum": f"$scores.{criterion}"}
+
+    expected = {}
+    async for row in team_evaluations_collection.aggregate(latest + [{"$group": group}], allowDiskUse=True):
+        key = (row["_id"]["team_id"], row["_id"]["round_id"])
+        expected[key] = {
+            "team_id": key[0],
+            "round_id": key[1],
+            "team_name": row["team_name"],
+            "total_evaluations": row["total_evaluations"],
+            "sum_total_score": row["sum_total_score"],
+            "sum_scores": {c: row[f"sum_{c}"] for c in EVALUATION_WEIGHTS},
+        }
+
+    stored_query = {} if round_id is None else {"round_id": round_id}
+    stored = {}
+    async for doc in evaluation_summary_collection.find(stored_query):
+        stored[(doc["team_id"], doc["round_id"])] = doc
+
+    def drifted(have: Optional[dict], want: dict) -> bool:
+        if have is None:
+            return True
+        if have.get("total_evaluations", 0) != want["total_evaluations"]:
+            return True
+        if abs(have.get("sum_total_score", 0.0) - want["sum_total_score"]) > 1e-6:
+            return True
+        have_scores = have.get("sum_scores", {})
+        return any(abs(have_scores.get(c, 0.0) - want["sum_scores"][c]) > 1e-6 for c in EVALUATION_WEIGHTS)
+
+    empty = {"total_evaluations": 0, "sum_total_score": 0.0, "sum_scores": {c: 0.0 for c in EVALUATION_WEIGHTS}}
+    drift = []
+    for key in set(expected) | set(stored):
+        want = expected.get(key, {**empty, "team_id": key[0], "round_id": key[1],
+                                   "team_name": stored[key].get("team_name", "")})
+        if not drifted(stored.get(key), want):
+            continue
+        drift.append({
+            "team_id": key[0],
+            "round_id": key[1],
+            "stored_evaluations": stored.get(key, {}).get("total_evaluations", 0),
+            "expected_evaluations": want["total_evaluations"],
+        })
+        if apply:
+            await evaluation_summary_collection.update_one(
+                {"team_id": key[0], "round_id": key[1]},
+                {"$set": {**want, "last_updated": datetime.utcnow()}},
+                upsert=True
+            )
+
+    return {
+        "duplicate_evaluations": duplicates,
+        "summaries_checked": len(set(expected) | set(stored)),
+        "drifted": len(drift),
+        "applied": apply,
+        "drift": drift
+    }
+
+# ==================== ADMIN ENDPOINTS ====================
+
+@router.post("/admin/reconcile-summaries", response_model=dict)
+async def reconcile_evaluation_summaries(
+    round_id: Optional[int] = None,
+    apply: bool = True,
+    current_admin = Depends(get_current_admin)
+):
+    """
+    Remove duplicate evaluations, rebuild evaluation summaries from scratch
+    and report drift against the incrementally maintained values. Use
+    apply=false for a dry run.
+    """
+    try:
+        report = await rebuild_evaluation_summaries(round_id=round_id, apply=apply)
+        if apply and (report["drifted"] or report["duplicate_evaluations"]):
+            invalidate_evaluation_boards()
+            await relay_event("evaluation_leaderboard", {"round_id": round_id, "reset": True})
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reconciling evaluation summaries: {str(e)}")
+
+@router.get("/admin/leaderboard", response_model=List[dict])
+async def get_evaluation_leaderboard(round_id: int = 1, offset: int = 0, limit: Optional[int] = None):
+    """
+    Get leaderboard based on evaluation scores (average total score across
+    judges), served from the in-memory ranked board of the round
+    """
+    try:
+        board = await get_evaluation_board(get_evaluation_summary_collection(), round_id)
+        return board.page(offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching leaderboard: {str(e)}")
+
+@router.get("/admin/leaderboard/{team_id}", response_model=dict)
+async def get_evaluation_leaderboard_position(team_id: str, round_id: int = 1, neighbors: int = 2):
+    """
+    Rank of one team in a round with the teams ranked just above and below it
+    """
+    try:
+        board = await get_evaluation_board(get_evaluation_summary_collection(), round_id)
+        position = board.neighbors(team_id, max(neighbors, 0))
     except Exception as e:
-        print(f"Error updating evaluation summary: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching leaderboard: {str(e)}")
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Team {team_id} has no evaluations in round {round_id}")
+    return {"round_id": round_id, "total_teams": len(board), **position}
@@ -0,0 +1,633 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+import os
+from datetime import datetime
+import uuid
+import json
+import hashlib
+import asyncio
+import pickle
+import tempfile
+from typing import Optional
+
+from pymongo import InsertOne, ReplaceOne
+
+from db.mongo import get_db
+from db.indexes import INDEX_REGISTRY
+from utils.excel_stream import iter_sheet_chunks_parallel, iter_sheet_chunks_serial
+from utils.executors import ExecutorBusy
+from utils.upload_buffer import ingest_upload, UploadBuffer
+from utils.jobs import job_runner, get_job
+from utils.ppt_leaderboard import (
+    LEADERBOARD_COLLECTION, load_board, claim_version, commit_board, publish_full_board,
+    invalidate_board, leaderboard_operations, board_lock
+)
+from utils.broadcaster import relay_event
+from utils.upload_ledger import find_identical_upload, record_upload, finish_upload
+
+router = APIRouter(prefix="/api", tags=["PPT Upload"])
+
+# Ledger kind of PPT report uploads
+PPT_UPLOAD_KIND = "ppt_report"
+
+# Rows per streamed chunk, i.e. per bulk_write round trip, when loading ppt_reports
+PPT_INSERT_CHUNK_SIZE = int(os.getenv("PPT_INSERT_CHUNK_SIZE", "500"))
+
+# Workbooks up to this size stay in memory and are parsed serially from their
+# bytes; larger ones spill to disk and their sheets are parsed in parallel
+PPT_SERIAL_PARSE_BYTES = int(os.getenv("PPT_SERIAL_PARSE_BYTES", str(1024 * 1024)))
+
+# Evaluation parameters with weights (consistent across all uploads)
+EVALUATION_PARAMETERS = {
+    'Problem': 'Problem Understanding',
+    'Innovation': 'Innovation & Uniqueness', 
+    'Technical': 'Technical Feasibility',
+    'Implement': 'Implementation Approach',
+    'Team': 'Team Readiness',
+    # 'Res': 'Research Depth',
+    'Potential': 'Potential Impact',
+    'Format & Design': 'Format & Design'
+}
+
+# Weights for each parameter (total = 100)
+EVALUATION_WEIGHTS = {
+    'Problem': 15,      # 15%
+    'Innovation': 20,   # 20%
+    'Technical': 20,    # 20%
+    'Implement': 15,    # 15%
+    'Team': 10,         # 10%
+    'Res': 10,          # 10%
+    'Potential': 5,     # 5%
+    'Format &': 5       # 5%
+}
+
+def _row_key(sheet_name: str, record: dict, occurrences: dict) -> str:
+    """Stable identity of a sheet row: sheet + Team ID, or team name; repeats get #n"""
+    identity = str(record.get("Team ID") or record.get("team_name") or record.get("Team Name") or "").strip()
+    count = occurrences.get((sheet_name, identity), 0)
+    occurrences[(sheet_name, identity)] = count + 1
+    row_key = f"{sheet_name}|{identity}"
+    return f"{row_key}#{count}" if count else row_key
+
+def _team_name(record: dict) -> str:
+    """Same fallback as the leaderboard pipeline's $ifNull chain"""
+    for field in ("team_name", "Team Name"):
+        if record.get(field) is not None:
+            return record[field]
+    return "Unknown Team"
+
+def _row_hash(record: dict) -> str:
+    payload = json.dumps(record, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+class PPTReportHandler:
+    def __init__(self, db):
+        """Bind to the shared async database handle"""
+        self.db = db
+
+        # Collection name for PPT reports
+        self.collection_name = "ppt_reports"
+        self.collection = self.db[self.collection_name]
+
+    def process_excel_file(self, upload: UploadBuffer, chunk_size: Optional[int] = None,
+                           filename: Optional[str] = None, timings: Optional[list] = None):
+        """
+        Stream the workbook as (sheet_name, records) chunks. A small upload
+        still in memory is parsed from its bytes in this process; a spilled
+        one has its sheets (one per judging room) parsed and cleaned
+        concurrently in worker processes with column-wise dtype coercion
+        (numeric columns -> float, text stripped, blanks -> ''). Both yield
+        the same records, in workbook order.
+        """
+        chunk_size = chunk_size or PPT_INSERT_CHUNK_SIZE
+        if upload.in_memory:
+            return iter_sheet_chunks_serial(upload.open(), chunk_size, filename=filename, timings=timings)
+        return iter_sheet_chunks_parallel(upload.source(), chunk_size, filename=filename, timings=timings)
+    
+    async def update_database(self, chunks, on_progress=None):
+        """
+        Apply the streamed upload to ppt_reports as a row-level diff. Rows
+        are keyed by sheet plus Team ID (team name when there is no Team ID).
+        New and changed rows are staged in a local spool file while the
+        workbook is read, so a parse error leaves ppt_reports untouched; only
+        once every sheet parsed are they written, one bulk_write per chunk,
+        and rows missing from the upload deleted. Returns (success,
+        total_records, progress, diff, changed_teams) where progress has one
+        entry per parsed chunk, diff counts the writes actually applied and
+        changed_teams names every team whose rows changed (None when that is
+        unknown); on_progress, if given, is awaited with each entry. If
+        writing fails part way, diff shows what was applied and
+        changed_teams is None.
+        """
+        progress = []
+        total_records = 0
+        diff = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        applying = False
+        with tempfile.TemporaryFile(prefix="ppt_diff_") as staged:
+            try:
+                # row_key -> (row_hash, team_name) of what is stored now
+                existing = {
+                    doc["row_key"]: (doc.get("row_hash"), doc.get("team_name"))
+                    async for doc in self.collection.find({"row_key": {"$exists": True}},
+                                                          {"_id": 0, "row_key": 1, "row_hash": 1, "team_name": 1})
+                }
+                seen = set()
+                changed_teams = set()
+                occurrences = {}
+                sheet_rows = {}   # data rows read so far per sheet
+                staged_chunks = 0
+                upload_timestamp = datetime.utcnow()
+
+                async for sheet_name, records in chunks:
+                    documents = []
+                    for record in records:
+                        row_index = sheet_rows.get(sheet_name, 0)
+                        sheet_rows[sheet_name] = row_index + 1
+                        row_key = _row_key(sheet_name, record, occurrences)
+                        row_hash = _row_hash(record)
+                        seen.add(row_key)
+                        total_records += 1
+                        stored_hash, stored_team = existing.get(row_key, (None, None))
+                        if stored_hash == row_hash:
+                            diff["unchanged"] += 1
+                            continue
+                        team_name = _team_name(record)
+                        changed_teams.add(team_name)
+                        if row_key in existing:
+                            changed_teams.add(stored_team)
+                        documents.append({
+                            "sheet_name": sheet_name,
+                            "data": record,
+                            "team_name": team_name,
+                            "upload_timestamp": upload_timestamp,
+                            "record_id": f"{sheet_name}_{row_index}",   # data row within the sheet
+                            "row_key": row_key,
+                            "row_hash": row_hash
+                        })
+
+                    if documents:
+                        await asyncio.to_thread(pickle.dump, documents, staged, pickle.HIGHEST_PROTOCOL)
+                        staged_chunks += 1
+                    progress.append({
+                        "sheet_name": sheet_name,
+                        "chunk": len(progress) + 1,
+                        "rows": len(records),
+                        "changed": len(documents),
+                        "total_rows": total_records
+                    })
+                    if on_progress is not None:
+                        await on_progress(progress[-1])
+
+                # Only now that every sheet parsed: write the staged rows, then drop
+                # rows the upload no longer has, plus rows stored before uploads were keyed
+                applying = True
+                staged.seek(0)
+                for _ in range(staged_chunks):
+                    documents = await asyncio.to_thread(pickle.load, staged)
+                    operations = []
+                    for document in documents:
+                        if document["row_key"] in existing:
+                            operations.append(ReplaceOne({"row_key": document["row_key"]}, document))
+                        else:
+                            operations.append(InsertOne(document))
+                    # ordered=False lets the server apply the batch in parallel
+                    result = await self.collection.bulk_write(operations, ordered=False)
+                    diff["inserted"] += result.inserted_count
+                    diff["updated"] += len(operations) - result.inserted_count
+
+                stale = [row_key for row_key in existing if row_key not in seen]
+                changed_teams.update(existing[row_key][1] for row_key in stale)
+                for start in range(0, len(stale), PPT_INSERT_CHUNK_SIZE):
+                    result = await self.collection.delete_many({"row_key": {"$in": stale[start:start + PPT_INSERT_CHUNK_SIZE]}})
+                    diff["deleted"] += result.deleted_count
+                result = await self.collection.delete_many({"row_key": {"$exists": False}})
+                diff["deleted"] += result.deleted_count
+                if result.deleted_count:
+                    changed_teams = None  # unkeyed legacy rows: their teams are unknown
+
+                print(f"Total upload completed: {total_records} rows in {len(progress)} chunks "
+                      f"({diff['inserted']} inserted, {diff['updated']} updated, "
+                      f"{diff['deleted']} deleted, {diff['unchanged']} unchanged)")
+                if changed_teams is not None:
+                    changed_teams.discard(None)
+                return True, total_records, progress, diff, changed_teams
+
+            except ExecutorBusy:
+                raise
+            except Exception as e:
+                if applying:
+                    print(f"Error uploading to MongoDB after {diff['inserted'] + diff['updated'] + diff['deleted']} writes: {e}")
+                else:
+                    print(f"Error reading upload, ppt_reports left unchanged: {e}")
+                return False, total_records, progress, diff, None
+
+    def _leaderboard_pipeline(self, match: Optional[dict] = None) -> list:
+        """Weighted total per team (best row wins), sorted by total then name"""
+        pipeline = [{"$match": match}] if match else []
+        pipeline += [
+            {"$project": {
+                "team_name": {
+                    "$ifNull": ["$data.team_name", {"$ifNull": ["$data.Team Name", "Unknown Team"]}]
+                },
+                "data": "$data"
+            }},
+            {"$project": {
+                "team_name": 1,
+                "problem_score": {"$convert": {"input": "$data.Problem", "to": "double", "onError": 0, "onNull": 0}},
+                "innovation_score": {"$convert": {"input": "$data.Innovation", "to": "double", "onError": 0, "onNull": 0}},
+                "technical_score": {"$convert": {"input": "$data.Technical", "to": "double", "onError": 0, "onNull": 0}},
+                "implement_score": {"$convert": {"input": "$data.Implement", "to": "double", "onError": 0, "onNull": 0}},
+                "team_score": {"$convert": {"input": "$data.Team", "to": "double", "onError": 0, "onNull": 0}},
+                "res_score": {"$convert": {"input": "$data.Res", "to": "double", "onError": 0, "onNull": 0}},
+                "potential_score": {"$convert": {"input": "$data.Potential", "to": "double", "onError": 0, "onNull": 0}},
+                "format_score": {"$convert": {"input": "$data.Format &", "to": "double", "onError": 0, "onNull": 0}}
+            }},
+            {"$project": {
+                "team_name": 1,
+                "total_weighted": {
+                    "$add": [
+                        {"$multiply": ["$problem_score", 15]},      # 15% weight
+                        {"$multiply": ["$innovation_score", 20]},   # 20% weight
+                        {"$multiply": ["$technical_score", 20]},    # 20% weight
+                        {"$multiply": ["$implement_score", 15]},    # 15% weight
+                        {"$multiply": ["$team_score", 10]},         # 10% weight
+                        {"$multiply": ["$res_score", 10]},          # 10% weight
+                        {"$multiply": ["$potential_score", 5]},     # 5% weight
+                        {"$multiply": ["$format_score", 5]}         # 5% weight
+                    ]
+                }
+            }},
+            {"$group": {
+                "_id": "$team_name",
+                "team_name": {"$first": "$team_name"},
+                "total_weighted": {"$max": "$total_weighted"}
+            }},
+            {"$project": {
+                "_id": 0, 
+                "team_name": 1, 
+                "total_weighted": {"$round": ["$total_weighted", 2]}
+            }},
+            # Team name breaks ties so full and incremental rebuilds rank alike
+            {"$sort": {"total_weighted": -1, "team_name": 1}}
+        ]
+        return pipeline
+
+    async def update_leaderboard(self, teams: Optional[set] = None):
+        """
+        Update the leaderboard based on the new PPT report data using weighted
+        scoring. With `teams`, only those teams are recomputed and moved on
+        the sorted board; otherwise (or if that fails) the whole board is rebuilt.
+        """
+        async with board_lock:
+            return await self._update_leaderboard(teams)
+
+    async def _update_leaderboard(self, teams: Optional[set]):
+        if teams is not None:
+            try:
+                return await self._update_leaderboard_incremental(teams)
+            except Exception as e:
+                invalidate_board()
+                print(f"⚠️ Incremental leaderboard update failed, rebuilding in full: {e}")
+        try:
+            results = await self.db.ppt_reports.aggregate(self._leaderboard_pipeline()).to_list(None)
+
+            # Add rank field
+            for idx, doc in enumerate(results, start=1):
+                doc["rank"] = idx
+
+            # Swap the rebuilt board in; readers never see an empty or partial leaderboard
+            await self.swap_in_leaderboard(results)
+            await publish_full_board(self.db, results)
+            await relay_event("leaderboard", {"board": "ppt", "reset": True, "total_teams": len(results)})
+            if results:
+                print(f"✅ Leaderboard updated with {len(results)} teams using weighted scoring")
+            else:
+                print("⚠️ No leaderboard data to update")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error updating leaderboard: {e}")
+            return False
+
+    async def _update_leaderboard_incremental(self, teams: set) -> bool:
+        """Recompute `teams` only and persist just the rows whose total or rank moved"""
+        board, version = await load_board(self.db, fresh=True)
+
+        # Teams with no rows left drop off the board
+        totals = {team: None for team in teams}
+        pipeline = self._leaderboard_pipeline({"team_name": {"$in": list(teams)}})
+        async for doc in self.collection.aggregate(pipeline):
+            totals[doc["team_name"]] = doc["total_weighted"]
+
+        removed, changed = board.apply(totals)
+        operations = leaderboard_operations(removed, changed)
+        if not operations:
+            print(f"✅ Leaderboard unchanged: {len(teams)} teams recomputed")
+            return True
+        await self.db[LEADERBOARD_COLLECTION].bulk_write(operations, ordered=False)
+
+        # Publish the new version only once its rows are written, so no worker
+        # can load a half-written board and cache it under the new version
+        new_version = await claim_version(self.db, version)
+        if new_version is None:
+            raise RuntimeError("leaderboard changed in another worker")
+        commit_board(new_version)
+        await relay_event("leaderboard", {
+            "board": "ppt", "removed": removed, "changed": changed, "total_teams": len(board)
+        })
+        print(f"✅ Leaderboard updated incrementally: {len(teams)} teams recomputed, {len(operations)} rows written")
+        return True
+
+    async def swap_in_leaderboard(self, results):
+        """Rebuild "leaderboard" in a shadow collection so readers never see a partial board"""
+        async def fill(shadow):
+            if results:
+                await shadow.insert_many(results, ordered=False)
+
+        await swap_collection(self.db, "leaderboard", fill)
+
+
+async def swap_collection(db, target: str, fill):
+    """
+    Build a replacement for `target` in a private shadow collection: create
+    its registered indexes, `await fill(shadow)`, then rename the shadow over
+    the target with dropTarget. The rename is atomic, so readers see the old
+    contents until the new ones are complete; on failure the shadow is dropped.
+    """
+    shadow = db[f"{target}_shadow_{uuid.uuid4().hex[:12]}"]
+    try:
+        # Creating the indexes also creates the (possibly empty) collection
+        await shadow.create_indexes(INDEX_REGISTRY[target])
+        await fill(shadow)
+        await shadow.rename(target, dropTarget=True)
+    except Exception:
+        await shadow.drop()
+        raise
+
+async def request_leaderboard_rebuild(db, teams: Optional[set] = None) -> str:
+    """
+    Queue a leaderboard recompute for `teams` (all teams when None).
+    Requests from every worker collapse into the queued run, which covers
+    the union of their teams.
+    """
+    if teams is None:
+        request = {"$set": {"request.all": True}}
+    else:
+        request = {"$addToSet": {"request.teams": {"$each": sorted(teams)}}}
+
+    async def rebuild(ctx):
+        # ctx.request is final once the job starts; later requests queue a new run
+        pending = None if ctx.request.get("all") else set(ctx.request.get("teams", []))
+        if not await PPTReportHandler(db).update_leaderboard(pending):
+            raise RuntimeError("Leaderboard update failed")
+        return {"leaderboard_updated": True, "teams": len(pending) if pending is not None else "all"}
+
+    return await job_runner.submit_coalesced(db, "leaderboard", "leaderboard_rebuild", rebuild, request)
+
+@router.post("/upload-ppt-report", status_code=202)
+async def upload_ppt_report(
+    file: UploadFile = File(...),
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000, description="Records per write batch"),
+    db = Depends(get_db)
+):
+    """
+    Upload a PPT Report Excel file. Returns a job id straight away; parsing,
+    the row-level diff against ppt_reports and the leaderboard rebuild run in
+    the background (poll GET /jobs/{job_id}). Re-uploading the file that is
+    already applied returns the previous job without doing any work.
+    """
+    try:
+        # Validate file type
+        if not file.filename.endswith(('.xlsx', '.xls')):
+            raise HTTPException(
+                status_code=400, 
+                detail="Invalid file type. Please upload an Excel file (.xlsx or .xls)"
+            )
+        
+        timings = []
+
+        # Spool the upload (memory, or disk past PPT_SERIAL_PARSE_BYTES) with the
+        # size cap enforced while reading; everything after this runs as a job
+        upload = await ingest_upload(file, spool_bytes=PPT_SERIAL_PARSE_BYTES)
+        filename = file.filename
+
+        # Same bytes as the upload currently applied: hand back its job and result
+        previous = await find_identical_upload(db, PPT_UPLOAD_KIND, upload.sha256)
+        if previous:
+            upload.close()
+            job = await get_job(db, previous["job_id"])
+            return JSONResponse(
+                status_code=200,
+                content=jsonable_encoder({
+                    "success": True,
+                    "message": "Identical to the last PPT report upload; nothing to update",
+                    "duplicate": True,
+                    "job_id": previous["job_id"],
+                    "status": job["status"] if job else "completed",
+                    "result": job.get("result") if job else None
+                })
+            )
+
+        job_id = uuid.uuid4().hex
+
+        async def ingest(ctx):
+            try:
+                handler = PPTReportHandler(db)
+
+                async def on_progress(entry):
+                    await ctx.progress(sheet_name=entry["sheet_name"], chunks=entry["chunk"],
+                                       records_processed=entry["total_rows"])
+
+                # Stream the workbook straight into the database, chunk by chunk
+                chunks = handler.process_excel_file(upload, chunk_size=chunk_size,
+                                                    filename=filename, timings=timings)
+                success, total_records, progress, diff, changed_teams = await handler.update_database(chunks, on_progress)
+                if not success:
+                    if diff["inserted"] + diff["updated"] + diff["deleted"]:
+                        # Some rows landed before the failure and now look unchanged
+                        # to a re-upload: rebuild the whole board from what is stored
+                        await request_leaderboard_rebuild(db, None)
+                    raise HTTPException(
+                        status_code=500, 
+                        detail="Failed to update database"
+                    )
+            except BaseException:
+                # Also on cancellation, so the ledger never keeps pointing at a dead job
+                await finish_upload(db, job_id, "failed")
+                raise
+            finally:
+                upload.close()
+            await finish_upload(db, job_id, "completed", diff)
+
+            # Back-to-back uploads share one leaderboard recompute; skip it when nothing changed
+            changed = diff["inserted"] + diff["updated"] + diff["deleted"]
+            leaderboard_job_id = await request_leaderboard_rebuild(db, changed_teams) if changed else None
+
+            return {
+                "success": True,
+                "message": f"PPT Report uploaded successfully! {total_records} records processed.",
+                "total_records": total_records,
+                "diff": diff,
+                "leaderboard_job_id": leaderboard_job_id,
+                "progress": progress,
+                "timings": timings,
+                "evaluation_parameters": list(EVALUATION_PARAMETERS.keys())
+            }
+
+        try:
+            await record_upload(db, PPT_UPLOAD_KIND, upload.sha256, filename, upload.size, job_id)
+            # One ingest at a time: each diffs against what the previous one left
+            await job_runner.submit(db, "ppt_upload", ingest, job_id=job_id, exclusive=True, filename=filename)
+        except Exception:
+            upload.close()
+            raise
+
+        return JSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "message": "Upload accepted, processing in the background",
+                "job_id": job_id,
+                "status": "queued"
+            }
+        )
+            
+    except HTTPException:
+        raise
+    except ExecutorBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Upload workers are busy, please retry shortly: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Upload failed: {str(e)}"
+        )
+
+@router.get("/leaderboard")
+async def get_leaderboard(offset: int = 0, limit: Optional[int] = None, db = Depends(get_db)):
+    """
+    Get the current leaderboard based on PPT report data, served from the
+    in-memory ranked board. Pass offset/limit for one page or limit alone for the top N.
+    """
+    try:
+        board, _ = await load_board(db)
+        leaderboard = board.page(offset, limit)
+
+        return {
+            "success": True,
+            "leaderboard": leaderboard,
+            "total_teams": len(board),
+            "evaluation_parameters": list(EVALUATION_PARAMETERS.keys())
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch leaderboard: {str(e)}"
+        )
+
+@router.get("/leaderboard/team/{team_name}")
+async def get_team_leaderboard_position(team_name: str, neighbors: int = 2, db = Depends(get_db)):
+    """
+    Rank of one team on the PPT leaderboard with the teams ranked just above and below it
+    """
+    try:
+        board, _ = await load_board(db)
+        position = board.neighbors(team_name, max(neighbors, 0))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch leaderboard: {str(e)}"
+        )
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Team '{team_name}' is not on the leaderboard")
+    return {"success": True, "total_teams": len(board), **position}
+
+@router.get("/evaluation-parameters")
+async def get_evaluation_parameters():
+    """
+    Get the evaluation parameters and weights used in the system
+    """
+    return {
+        "success": True,
+        "parameters": EVALUATION_PARAMETERS,
+        "weights": EVALUATION_WEIGHTS,
+        "description": "These parameters and weights remain consistent across all evaluations"
+    }
+
+@router.get("/team-evaluation/{team_name}")
+async def get_team_ppt_evaluation(team_name: str, db = Depends(get_db)):
+    """
+    Get PPT evaluation data for a specific team by team name
+    """
+    try:
+        # Find the team's PPT evaluation data
+        ppt_data = await db["ppt_reports"].find_one({
+            "data.team_name": team_name
+        })
+        
+        if not ppt_data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No PPT evaluation data found for team: {team_name}"
+            )
+        
+        # Extract the evaluation data
+        evaluation_data = ppt_data.get("data", {})
+        
+        # Debug: Print all available fields
+        print(f"Available fields for team {team_name}:")
+        for key, value in evaluation_data.items():
+            print(f"  {key}: {value}")
+        
+        # Calculate weighted score
+        weighted_score = 0
+        raw_scores = {}
+        
+        for param_key, param_name in EVALUATION_PARAMETERS.items():
+            score = evaluation_data.get(param_name, 0)
+            if isinstance(score, (int, float)):
+                raw_scores[param_name] = score
+                weight = EVALUATION_WEIGHTS.get(param_key, 0)
+                weighted_score += (score * weight / 100)
+        
+        # Use the original total_weighted from database if available
+        original_weighted = evaluation_data.get("total_weighted", 0)
+        if original_weighted and isinstance(original_weighted, (int, float)):
+            weighted_score = original_weighted
+        
+        # Prepare response
+        response_data = {
+            "team_name": team_name,
+            "sheet_name": ppt_data.get("sheet_name", "Unknown"),
+            "upload_timestamp": ppt_data.get("upload_timestamp", ""),
+            "evaluation_scores": raw_scores,
+            "total_raw_score": evaluation_data.get("total_raw", 0),
+            "total_weighted_score": round(weighted_score, 2),
+            "summary": evaluation_data.get("summary", ""),
+            "workflow_overall": evaluation_data.get("workflow_overall", ""),
+            "feedback_positive": evaluation_data.get("feedback_positive", ""),
+            "feedback_criticism": evaluation_data.get("feedback_criticism", ""),
+            "feedback_technical": evaluation_data.get("feedback_technical", ""),
+            "feedback_suggestions": evaluation_data.get("feedback_suggestions", ""),
+            "evaluation_parameters": EVALUATION_PARAMETERS,
+            "evaluation_weights": EVALUATION_WEIGHTS
+        }
+        
+        return {
+            "success": True,
+            "data": response_data
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch team PPT evaluation: {str(e)}"
+        )
+
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
 from db.mongo import get_database  # Import the function instead of direct db
+from utils.active_round import (
+    ACTIVE_ROUND_ID, active_round_headers, cache_active_round, get_active_round_state,
+    is_not_modified, mongo_now
+)
 
 
 class ActiveRoundResponse(BaseModel):
@@ -15,7 +21,10 @@ router = APIRouter(prefix="/round-state", tags=["Round State"])
 
 
 @router.get("/active", response_model=ActiveRoundResponse)
-async def get_active_round():
+async def get_active_round(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
     db = get_database()
     if db is None:
         raise HTTPException(
@@ -24,23 +33,19 @@ async def get_active_round():
         )
     
     try:
-        doc = await db.round_state.find_one({"_id": "active_round"})
-        if not doc:
-            # initialize if not present
-            now = datetime.utcnow()
-            await db.round_state.update_one(
-                {"_id": "active_round"},
-                {"$setOnInsert": {"round": None, "updated_at": now}},
-                upsert=True,
-            )
-            return {"round": None, "updated_at": now}
-        return {"round": doc.get("round"), "updated_at": doc.get("updated_at", datetime.utcnow())}
+        # Served from the worker's cache; Mongo is only read on the first call
+        state = await get_active_round_state(db)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error accessing database: {str(e)}"
         )
 
+    headers = active_round_headers(state)
+    if is_not_modified(state, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=jsonable_encoder(state), headers=headers)
+
 
 class SetActiveRoundRequest(BaseModel):
     round: Optional[int]
@@ -60,12 +65,14 @@ async def set_active_round(payload: SetActiveRoundRequest):
         )
     
     try:
-        now = datetime.utcnow()
+        now = mongo_now()
         await db.round_state.update_one(
-            {"_id": "active_round"},
+            {"_id": ACTIVE_ROUND_ID},
             {"$set": {"round": payload.round, "updated_at": now}},
             upsert=True,
         )
+        # Update this worker's cache now (and notify live clients); other workers follow via round_state changes
+        cache_active_round(payload.round, now)
         return {"round": payload.round, "updated_at": now}
     except Exception as e:
         raise HTTPException(
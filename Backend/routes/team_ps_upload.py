@@ -0,0 +1,396 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
+from fastapi.responses import JSONResponse
+import pandas as pd
+import os
+from typing import List, Optional
+import uuid
+from datetime import datetime
+from pymongo import UpdateOne, DeleteOne
+
+from db.mongo import get_db
+from Schema.team_ps_details import TeamPSDetails, ExcelUploadResponse
+from auth.auth_routes import get_current_user
+from utils.team_roster import transform_team
+from utils.excel_stream import iter_sheets, clean_text_cell
+from utils.executors import get_executor, ExecutorBusy
+from utils.jobs import job_runner, get_job
+from utils.upload_ledger import find_identical_upload, record_upload, finish_upload
+from utils.upload_buffer import ingest_upload, UploadBuffer
+
+# main.py mounts this router under /team-ps
+router = APIRouter(tags=["Team and Problem Statement Details"])
+
+REQUIRED_COLUMNS = [
+    'Team Name', 'College', 'Department', 'Year',
+    'Team Leader Name', 'Team Leader Roll No', 'Team Leader Email', 'Team Leader Contact',
+    'Member 1 Name', 'Member 1 Roll No', 'Member 1 Email', 'Member 1 Contact',
+    'Member 2 Name', 'Member 2 Roll No', 'Member 2 Email', 'Member 2 Contact',
+    'Problem Statement ID', 'Problem Statement Title', 'Problem Statement Description',
+    'Category', 'Difficulty', 'Domain'
+]
+
+# Rows per streamed chunk: one DataFrame, one $in pre-query and one bulk_write each
+TEAM_PS_CHUNK_SIZE = int(os.getenv("TEAM_PS_CHUNK_SIZE", "500"))
+
+# Ledger kind of registration sheet uploads
+TEAM_PS_UPLOAD_KIND = "team_ps"
+
+# Fields that are owned by the database rather than the sheet
+_SERVER_FIELDS = {"_id", "team_id", "created_at", "updated_at"}
+
+
+def _clean_team_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Column-wise normalization: every required column as stripped text, blanks as ''"""
+    cleaned = df[REQUIRED_COLUMNS].astype("string").apply(lambda column: column.str.strip())
+    return cleaned.fillna("")
+
+
+def _open_first_sheet(upload: UploadBuffer):
+    """Open the workbook and return (sheets, columns, chunks) for its first sheet (blocking)"""
+    sheets = iter_sheets(upload.open(), TEAM_PS_CHUNK_SIZE, clean=clean_text_cell, first_sheet_only=True)
+    _, columns, chunks = next(sheets, (None, [], iter(())))
+    # sheets is returned too: it owns the open workbook until the chunks are consumed
+    return sheets, columns, chunks
+
+
+def _next_team_frame(chunks, columns: List[str], offset: int) -> Optional[pd.DataFrame]:
+    """Pull and clean the next chunk; the index continues the sheet's row numbering (blocking)"""
+    records = next(chunks, None)
+    if records is None:
+        return None
+    cleaned = _clean_team_frame(pd.DataFrame.from_records(records, columns=columns))
+    cleaned.index = range(offset, offset + len(cleaned))
+    return cleaned
+
+
+def _build_team_documents(cleaned: pd.DataFrame) -> List[dict]:
+    """Nest the flat, already-clean columns into team documents (no per-cell work)"""
+    documents = []
+    for row in cleaned.to_dict("records"):
+        team_members = [
+            {
+                "name": row[f'Member {i} Name'],
+                "roll_no": row[f'Member {i} Roll No'],
+                "email": row[f'Member {i} Email'],
+                "contact": row[f'Member {i} Contact'],
+                "role": "Member"
+            }
+            for i in (1, 2)
+            if row[f'Member {i} Name']
+        ]
+        documents.append({
+            "team_name": row['Team Name'],
+            "college": row['College'],
+            "department": row['Department'],
+            "year": row['Year'],
+            "team_leader": {
+                "name": row['Team Leader Name'],
+                "roll_no": row['Team Leader Roll No'],
+                "email": row['Team Leader Email'],
+                "contact": row['Team Leader Contact'],
+                "role": "Team Leader"
+            },
+            "team_members": team_members,
+            "problem_statement": {
+                "ps_id": row['Problem Statement ID'],
+                "title": row['Problem Statement Title'],
+                "description": row['Problem Statement Description'],
+                "category": row['Category'],
+                "difficulty": row['Difficulty'],
+                "domain": row['Domain']
+            },
+            "mentor": None,
+            "status": "active"
+        })
+    return documents
+
+
+async def _ingest_team_ps(db, columns: List[str], chunks, dry_run: bool, timings: list, ctx=None) -> dict:
+    """
+    Consume the cleaned chunks of a team/PS sheet: diff each chunk against
+    the stored teams and upsert the changes, then delete stored teams the
+    sheet no longer lists. Runs as a background job; ctx receives row counts
+    as chunks complete.
+    """
+    upload_io = get_executor("io")
+    teams_processed = 0
+    errors = []
+    first_row = {}   # (team_name, college) -> sheet row that introduced it
+    planned = {}     # (team_name, college) -> "insert" | "update" | "unchanged"
+    now = datetime.utcnow()
+
+    stored = [
+        (team["team_name"], team.get("college"))
+        async for team in db.team_ps_details.find({}, {"_id": 0, "team_name": 1, "college": 1})
+    ]
+
+    while True:
+        cleaned = await upload_io.run(_next_team_frame, chunks, columns, teams_processed,
+                                      job="parse chunk", timings=timings)
+        if cleaned is None:
+            break
+        teams_processed += len(cleaned)
+
+        # Rows without a team name cannot be keyed; report them with their sheet row number
+        unnamed = cleaned['Team Name'] == ""
+        errors.extend(f"Row {index + 2}: missing Team Name" for index in cleaned.index[unnamed])
+        cleaned = cleaned[~unnamed]
+
+        # A team listed twice in one sheet: the last row wins, as with the old row-by-row upsert
+        duplicated = cleaned.duplicated(subset=['Team Name', 'College'], keep="last")
+        errors.extend(f"Row {index + 2}: duplicate team, superseded by a later row"
+                      for index in cleaned.index[duplicated])
+        cleaned = cleaned[~duplicated]
+
+        documents = _build_team_documents(cleaned)
+
+        # One $in pre-query per chunk for the teams already stored
+        existing = {}
+        async for team in db.team_ps_details.find({"team_name": {"$in": [d["team_name"] for d in documents]}}):
+            existing[(team["team_name"], team.get("college"))] = team
+
+        changed = []
+        for index, doc in zip(cleaned.index, documents):
+            key = (doc["team_name"], doc["college"])
+            if key in first_row:
+                # Seen in an earlier chunk: that row is superseded by this one
+                errors.append(f"Row {first_row[key] + 2}: duplicate team, superseded by a later row")
+                first_row[key] = index
+                planned[key] = "insert" if planned[key] == "insert" else "update"
+                changed.append(doc)
+                continue
+            first_row[key] = index
+            current = existing.get(key)
+            if current is None:
+                planned[key] = "insert"
+                changed.append(doc)
+            elif {k: v for k, v in current.items() if k not in _SERVER_FIELDS} != doc:
+                planned[key] = "update"
+                changed.append(doc)
+            else:
+                planned[key] = "unchanged"
+
+        if ctx is not None:
+            await ctx.progress(rows_processed=teams_processed, teams=len(planned), errors=len(errors))
+        if dry_run or not changed:
+            continue
+        operations = [
+            UpdateOne(
+                {"team_name": doc["team_name"], "college": doc["college"]},
+                {
+                    "$set": {**doc, "updated_at": now},
+                    "$setOnInsert": {"team_id": f"TEAM_{uuid.uuid4().hex[:8].upper()}", "created_at": now}
+                },
+                upsert=True
+            )
+            for doc in changed
+        ]
+        await db.team_ps_details.bulk_write(operations, ordered=False)
+
+    # Teams dropped from the sheet; an upload without a single valid row deletes nothing
+    stale = [key for key in stored if key not in planned]
+    if stale and not planned:
+        errors.append("No valid team rows found; existing teams were left untouched")
+        stale = []
+    if stale and not dry_run:
+        await db.team_ps_details.bulk_write(
+            [DeleteOne({"team_name": name, "college": college}) for name, college in stale],
+            ordered=False
+        )
+
+    diff = {
+        "inserts": [name for (name, _), status in planned.items() if status == "insert"],
+        "updates": [name for (name, _), status in planned.items() if status == "update"],
+        "deletes": [name for name, _ in stale],
+        "unchanged": sum(1 for status in planned.values() if status == "unchanged")
+    }
+    if ctx is not None:
+        await ctx.update(errors=errors)
+    if dry_run:
+        return ExcelUploadResponse(
+            message="Dry run: no changes written",
+            teams_processed=teams_processed,
+            teams_saved=0,
+            errors=errors,
+            dry_run=True,
+            diff=diff,
+            timings=timings
+        ).model_dump()
+
+    return ExcelUploadResponse(
+        message="Excel file processed successfully",
+        teams_processed=teams_processed,
+        teams_saved=len(planned),
+        errors=errors,
+        diff=diff,
+        timings=timings
+    ).model_dump()
+
+
+@router.post("/upload-excel", status_code=202)
+async def upload_team_ps_excel(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Return the insert/update/delete diff without writing"),
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Upload Excel file containing team and problem statement details
+    and save to MongoDB collection. Column checks happen up front; the rows
+    are processed as a background job (poll GET /jobs/{job_id}). Re-uploading
+    the sheet that is already applied returns the previous job.
+    """
+    if not file.filename.endswith('.xlsx'):
+        raise HTTPException(status_code=400, detail="Only Excel (.xlsx) files are allowed")
+
+    try:
+        # Spool the upload with the size cap enforced while reading; the parser
+        # reads that buffer directly. Only the first sheet is streamed, chunk by
+        # chunk, with parsing and frame cleaning in the io executor.
+        upload = await ingest_upload(file)
+
+        # Same bytes as the registration sheet currently applied: hand back its job and result
+        previous = None if dry_run else await find_identical_upload(db, TEAM_PS_UPLOAD_KIND, upload.sha256)
+        if previous:
+            upload.close()
+            job = await get_job(db, previous["job_id"])
+            return {
+                "message": "Identical to the last team/PS upload; nothing to update",
+                "duplicate": True,
+                "job_id": previous["job_id"],
+                "status": job["status"] if job else "completed",
+                "result": job.get("result") if job else None
+            }
+
+        try:
+            timings = []
+            sheets, columns, chunks = await get_executor("io").run(
+                _open_first_sheet, upload, job="open workbook", timings=timings
+            )
+
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+            if missing_columns:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Missing required columns: {', '.join(missing_columns)}"
+                )
+
+            job_id = uuid.uuid4().hex
+
+            # The request body is gone once we respond; the rest runs as a job
+            async def ingest(ctx):
+                try:
+                    result = await _ingest_team_ps(db, columns, chunks, dry_run, timings, ctx)
+                except BaseException:
+                    # Also on cancellation, so the ledger never keeps pointing at a dead job
+                    if not dry_run:
+                        await finish_upload(db, job_id, "failed")
+                    raise
+                finally:
+                    sheets.close()  # releases the workbook
+                    upload.close()
+                if not dry_run:
+                    await finish_upload(db, job_id, "completed", result["diff"])
+                return result
+
+            if not dry_run:
+                await record_upload(db, TEAM_PS_UPLOAD_KIND, upload.sha256, file.filename, upload.size, job_id)
+            # One applying ingest at a time: each diffs against (and deletes from) what the previous one left
+            await job_runner.submit(db, "team_ps_upload", ingest, job_id=job_id, exclusive=not dry_run,
+                                    filename=file.filename, dry_run=dry_run, uploaded_by=current_user.get("email"))
+        except BaseException:
+            upload.close()
+            raise
+        return {"message": "Upload accepted, processing in the background", "job_id": job_id, "status": "queued"}
+
+    except HTTPException:
+        raise
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=f"Upload workers are busy, please retry shortly: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+
+@router.get("/teams", response_model=List[dict])
+async def get_all_teams_ps_details(
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get all teams with their problem statement details
+    """
+    try:
+        teams = await db.team_ps_details.find({"status": "active"}).to_list(None)
+
+        # Convert ObjectId to string for JSON serialization
+        for team in teams:
+            team["_id"] = str(team["_id"])
+
+        return teams
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teams: {str(e)}")
+
+@router.get("/teams/{team_id}", response_model=dict)
+async def get_team_ps_details(
+    team_id: str,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get specific team details by team ID
+    """
+    try:
+        # Fetch from FinalTeamandpsdetails collection instead of team_ps_details
+        team = await db.FinalTeamandpsdetails.find_one({"Team ID": team_id})
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found")
+
+        # Transform the data to match the expected frontend structure
+        return transform_team(team)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching team: {str(e)}")
+
+@router.get("/college/{college_name}", response_model=List[dict])
+async def get_teams_by_college(
+    college_name: str,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get all teams from a specific college
+    """
+    try:
+        teams = await db.team_ps_details.find({
+            "college": {"$regex": college_name, "$options": "i"},
+            "status": "active"
+        }).to_list(None)
+
+        for team in teams:
+            team["_id"] = str(team["_id"])
+
+        return teams
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teams: {str(e)}")
+
+@router.get("/category/{category}", response_model=List[dict])
+async def get_teams_by_category(
+    category: str,
+    current_user: dict = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Get all teams in a specific category
+    """
+    try:
+        teams = await db.team_ps_details.find({
+            "problem_statement.category": {"$regex": category, "$options": "i"},
+            "status": "active"
+        }).to_list(None)
+
+        for team in teams:
+            team["_id"] = str(team["_id"])
+
+        return teams
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teams: {str(e)}")
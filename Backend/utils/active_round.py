@@ -0,0 +1,146 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from utils.broadcaster import broadcaster
+
+# ------------------ 🎯 Cached active round ------------------
+# The active round changes a few times a day but is read by every panel on
+# load, so each worker keeps it in memory. set_active_round() updates the
+# cache directly; changes made through other workers arrive through a change
+# stream on round_state or, where change streams are unavailable (standalone
+# mongod), one poll every ROUND_STATE_POLL_S per worker. Every actual change
+# is published once on the live "active_round" channel.
+
+ACTIVE_ROUND_ID = "active_round"
+ROUND_STATE_POLL_S = float(os.getenv("ROUND_STATE_POLL_S", "5"))
+
+_state = {"round": None, "updated_at": None, "loaded": False}
+_watcher = {"task": None}
+
+
+def mongo_now() -> datetime:
+    """utcnow() at the millisecond precision Mongo stores, so cached and re-read values compare equal"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def cache_active_round(round_value: Optional[int], updated_at: datetime) -> bool:
+    """Store the active round; returns True (and publishes, unless this is the first load) if it changed"""
+    if _state["loaded"] and (_state["round"], _state["updated_at"]) == (round_value, updated_at):
+        return False
+    first_load = not _state["loaded"]
+    _state.update(round=round_value, updated_at=updated_at, loaded=True)
+    if not first_load:
+        broadcaster.publish("active_round", {"round": round_value, "updated_at": updated_at})
+    return True
+
+
+async def _load(db) -> None:
+    doc = await db.round_state.find_one({"_id": ACTIVE_ROUND_ID})
+    if not doc:
+        # initialize if not present
+        now = mongo_now()
+        await db.round_state.update_one(
+            {"_id": ACTIVE_ROUND_ID},
+            {"$setOnInsert": {"round": None, "updated_at": now}},
+            upsert=True,
+        )
+        doc = await db.round_state.find_one({"_id": ACTIVE_ROUND_ID}) or {"round": None, "updated_at": now}
+    cache_active_round(doc.get("round"), doc.get("updated_at") or mongo_now())
+
+
+async def get_active_round_state(db) -> dict:
+    """{"round", "updated_at"} from memory; the first call in a worker reads Mongo"""
+    if not _state["loaded"]:
+        await _load(db)
+    return {"round": _state["round"], "updated_at": _state["updated_at"]}
+
+
+# ------------------ Conditional GET support ------------------
+
+def active_round_etag(state: dict) -> str:
+    stamp = int(state["updated_at"].timestamp() * 1000)
+    return f'W/"round-{state["round"]}-{stamp}"'
+
+
+def active_round_headers(state: dict) -> dict:
+    return {
+        "ETag": active_round_etag(state),
+        "Last-Modified": format_datetime(state["updated_at"].replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def is_not_modified(state: dict, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """RFC 7232: If-None-Match wins when present, else compare If-Modified-Since at second precision"""
+    if if_none_match:
+        etag = active_round_etag(state)
+        return any(tag.strip() in (etag, etag[2:], "*") for tag in if_none_match.split(","))
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).astimezone(timezone.utc).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+        return state["updated_at"].replace(microsecond=0) <= since
+    return False
+
+
+# ------------------ Cross-worker invalidation ------------------
+
+async def _watch_change_stream(db):
+    pipeline = [{"$match": {"documentKey._id": ACTIVE_ROUND_ID}}]
+    async with db.round_state.watch(pipeline, full_document="updateLookup") as stream:
+        print("✅ Watching round_state change stream")
+        # Anything that changed before the stream opened
+        await _load(db)
+        async for change in stream:
+            doc = change.get("fullDocument")
+            if doc is None:
+                # Deleted (or gone before the lookup): re-read, which re-initialises it
+                await _load(db)
+            else:
+                cache_active_round(doc.get("round"), doc.get("updated_at") or mongo_now())
+
+
+async def _poll(db):
+    print(f"⚠️ round_state change stream unavailable, polling every {ROUND_STATE_POLL_S:g}s")
+    while True:
+        try:
+            await _load(db)
+        except PyMongoError as e:
+            print(f"⚠️ Polling round_state failed: {e}")
+        await asyncio.sleep(ROUND_STATE_POLL_S)
+
+
+async def _watch(db):
+    while True:
+        try:
+            await _watch_change_stream(db)
+        except OperationFailure:
+            # Change streams need a replica set; standalone servers get polled
+            return await _poll(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ round_state change stream closed ({e}), reopening")
+            await asyncio.sleep(ROUND_STATE_POLL_S)
+
+
+def start_active_round_watcher(db):
+    if _watcher["task"] is None:
+        _watcher["task"] = asyncio.create_task(_watch(db))
+
+
+async def stop_active_round_watcher():
+    task, _watcher["task"] = _watcher["task"], None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
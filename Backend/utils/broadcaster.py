@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+
+# ------------------ 📡 Live event broadcaster ------------------
+# One in-process fan-out for server-sent events. Write paths publish a single
+# event (a leaderboard delta, an active-round change) and every connected
+# /events client gets it from its own bounded queue, so N subscribers cost
+# one publish and no extra database reads. A client too slow to drain its
+# queue gets its backlog replaced by a single "resync" event, after which it
+# should re-fetch the full state over HTTP.
+#
+# Fan-out is per process. Topics whose writes happen in one worker only (the
+# leaderboards) are relayed: relay_event() appends the event to the capped
+# `live_events` collection and every worker tails it with a tailable cursor
+# (works on standalone mongod too) and publishes it to its own subscribers.
+# active_round needs no relay; each worker's round_state watcher publishes it.
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_HEARTBEAT_S = float(os.getenv("EVENTS_HEARTBEAT_S", "15"))
+EVENTS_COLLECTION = "live_events"
+EVENTS_CAPPED_BYTES = int(os.getenv("EVENTS_CAPPED_BYTES", str(8 * 1024 * 1024)))
+EVENTS_CAPPED_DOCS = int(os.getenv("EVENTS_CAPPED_DOCS", "5000"))
+# Pause before reopening the tail after it dies
+EVENTS_RELAY_RETRY_S = float(os.getenv("EVENTS_RELAY_RETRY_S", "2"))
+
+
+class Subscription:
+    def __init__(self, topics: Optional[Set[str]], maxsize: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, message: str):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(format_event("resync", {"reason": "subscriber fell behind"}))
+
+
+def format_event(topic: str, data: dict) -> str:
+    """One SSE frame"""
+    return f"event: {topic}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+class Broadcaster:
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(set(topics) if topics else None, self._queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, topic: str, data: dict):
+        """Fan one event out to every subscriber of `topic`; never blocks the publisher"""
+        if not self._subscribers:
+            return
+        message = format_event(topic, {**data, "sent_at": datetime.utcnow()})
+        for subscription in list(self._subscribers):
+            if subscription.wants(topic):
+                subscription.offer(message)
+        self.published += 1
+
+    def resync(self, reason: str):
+        """Tell every subscriber to re-fetch full state (events may have been missed)"""
+        message = format_event("resync", {"reason": reason})
+        for subscription in list(self._subscribers):
+            subscription.offer(message)
+
+    async def stream(self, subscription: Subscription, is_disconnected):
+        """SSE body for one client: its events, with a comment heartbeat to keep proxies from closing it"""
+        try:
+            yield format_event("hello", {"topics": sorted(subscription.topics or [])})
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), timeout=EVENTS_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "published": self.published}
+
+
+broadcaster = Broadcaster()
+
+
+# ------------------ Cross-worker relay ------------------
+
+WORKER_ID = uuid.uuid4().hex[:12]
+_relay = {"db": None, "task": None}
+
+
+async def relay_event(topic: str, data: dict):
+    """
+    Publish to the subscribers of every worker: through live_events when the
+    relay runs, else (no database at startup, or the insert failed) to this
+    worker's subscribers only.
+    """
+    db = _relay["db"]
+    if db is not None:
+        try:
+            await db[EVENTS_COLLECTION].insert_one({
+                "topic": topic, "data": jsonable_encoder(data), "origin": WORKER_ID, "sent_at": datetime.utcnow()
+            })
+            return
+        except PyMongoError as e:
+            print(f"⚠️ Could not relay {topic} event, publishing locally: {e}")
+    broadcaster.publish(topic, data)
+
+
+async def _ensure_events_collection(db):
+    try:
+        await db.create_collection(EVENTS_COLLECTION, capped=True, size=EVENTS_CAPPED_BYTES, max=EVENTS_CAPPED_DOCS)
+    except CollectionInvalid:
+        pass  # already there
+    # A tailable cursor on an empty capped collection dies at once; keep one marker in it
+    if await db[EVENTS_COLLECTION].find_one({}) is None:
+        await db[EVENTS_COLLECTION].insert_one({"topic": None, "origin": WORKER_ID, "sent_at": datetime.utcnow()})
+
+
+async def _tail(db):
+    events = db[EVENTS_COLLECTION]
+    # Skip what was relayed before this tail opened: everything up to the current last event
+    last = await events.find_one({}, sort=[("$natural", -1)])
+    cursor = events.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+    caught_up = last is None
+    print("✅ Tailing live_events")
+    while cursor.alive:
+        async for event in cursor:
+            if not caught_up:
+                caught_up = event["_id"] == last["_id"]
+                continue
+            if event.get("topic"):
+                broadcaster.publish(event["topic"], event.get("data") or {})
+        await asyncio.sleep(0)
+    raise OperationFailure("live_events cursor closed")
+
+
+async def _run_relay(db):
+    while True:
+        try:
+            await _ensure_events_collection(db)
+            await _tail(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ live_events tail closed ({e}), reopening")
+        # Events relayed while the tail was down never reach this worker's subscribers
+        broadcaster.resync("live event relay reconnected")
+        await asyncio.sleep(EVENTS_RELAY_RETRY_S)
+
+
+def start_event_relay(db):
+    if _relay["task"] is None:
+        _relay["db"] = db
+        _relay["task"] = asyncio.create_task(_run_relay(db))
+
+
+async def stop_event_relay():
+    task, _relay["task"] = _relay["task"], None
+    _relay["db"] = None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# ------------------ ⚙️ Upload executors ------------------
+# Blocking upload work (Excel parsing, temp file copies) runs in one of two
+# bounded pools beside the event loop, so judges' requests keep flowing while
+# an admin uploads a sheet:
+#   "io"  - threads, for file copies and small blocking reads
+#   "cpu" - processes, for workbook parsing and cleaning
+# Each pool admits at most workers + queue_depth jobs at a time; a job that
+# cannot get a slot within UPLOAD_ADMIT_TIMEOUT_S is rejected with ExecutorBusy.
+
+UPLOAD_IO_WORKERS = int(os.getenv("UPLOAD_IO_WORKERS", "4"))
+UPLOAD_CPU_WORKERS = int(os.getenv("UPLOAD_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+UPLOAD_QUEUE_DEPTH = int(os.getenv("UPLOAD_QUEUE_DEPTH", "16"))
+UPLOAD_ADMIT_TIMEOUT_S = float(os.getenv("UPLOAD_ADMIT_TIMEOUT_S", "30"))
+
+# Recent job timings kept per executor for the admin stats endpoint
+_HISTORY_SIZE = 200
+
+
+class ExecutorBusy(Exception):
+    """Raised when an executor's queue stays full past the admission timeout"""
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Runs inside the worker: report wall-clock start/finish with the result"""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time()
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, executor: Executor, max_workers: int, queue_depth: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._executor = executor
+        self._slots = asyncio.Semaphore(max_workers + queue_depth)
+        self._in_flight = 0
+        self.history = deque(maxlen=_HISTORY_SIZE)
+
+    async def run(self, fn: Callable, *args, job: Optional[str] = None,
+                  timings: Optional[List[dict]] = None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool and return its result. Queue wait
+        (submit -> start in a worker) and run time are logged, kept in
+        history and, when given, appended to the caller's timings list.
+        """
+        submitted = time.time()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=UPLOAD_ADMIT_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            raise ExecutorBusy(f"{self.name} executor is busy ({self._in_flight} jobs in flight)")
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._executor, _timed_call, fn, args, kwargs
+            )
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+        stat = {
+            "executor": self.name,
+            "job": job or getattr(fn, "__name__", "job"),
+            "queue_wait_ms": round(max(started - submitted, 0.0) * 1000, 1),
+            "run_ms": round((finished - started) * 1000, 1),
+            "finished_at": finished,
+        }
+        self.history.append(stat)
+        if timings is not None:
+            timings.append(stat)
+        print(f"⏱️ [{self.name}] {stat['job']}: waited {stat['queue_wait_ms']} ms, ran {stat['run_ms']} ms")
+        return result
+
+    def stats(self) -> dict:
+        jobs = list(self.history)
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "recent_jobs": len(jobs),
+            "avg_queue_wait_ms": round(sum(j["queue_wait_ms"] for j in jobs) / len(jobs), 1) if jobs else 0.0,
+            "avg_run_ms": round(sum(j["run_ms"] for j in jobs) / len(jobs), 1) if jobs else 0.0,
+            "jobs": jobs[-20:],
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """The shared "io" or "cpu" upload executor, created on first use"""
+    if name not in _executors:
+        if name == "io":
+            pool = ThreadPoolExecutor(max_workers=UPLOAD_IO_WORKERS, thread_name_prefix="upload-io")
+            _executors[name] = BoundedExecutor(name, pool, UPLOAD_IO_WORKERS, UPLOAD_QUEUE_DEPTH)
+        elif name == "cpu":
+            pool = ProcessPoolExecutor(max_workers=UPLOAD_CPU_WORKERS)
+            _executors[name] = BoundedExecutor(name, pool, UPLOAD_CPU_WORKERS, UPLOAD_QUEUE_DEPTH)
+        else:
+            raise ValueError(f"Unknown executor: {name}")
+    return _executors[name]
+
+
+def executor_stats() -> dict:
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_executors():
+    """Stop every pool (called on app shutdown)"""
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
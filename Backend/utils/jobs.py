@@ -0,0 +1,267 @@
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from utils.upload_ledger import fail_uploads_of_jobs
+
+# ------------------ 🧵 Background jobs ------------------
+# Long uploads run as in-process asyncio tasks; their state lives in the
+# `jobs` collection so the admin portal can poll GET /jobs/{id} from any
+# worker. Work that only needs to happen once per burst (the leaderboard
+# rebuild) is submitted with a coalesce key: requests arriving in any worker
+# while a run is still queued merge into that run's `request` instead of
+# starting another one (a unique index allows one queued run per key). Jobs submitted
+# as exclusive run one at a time per kind across every worker: an asyncio.Lock
+# orders them inside a process and a lease document in `job_leases` (renewed
+# while the job runs, expiring if its process dies) orders the processes.
+
+JOBS_COLLECTION = "jobs"
+JOB_LEASES_COLLECTION = "job_leases"
+# How long a coalesced job waits for more requests before it starts
+JOB_COALESCE_DELAY_S = float(os.getenv("JOB_COALESCE_DELAY_S", "2"))
+# A queued/running job with no update for this long belongs to a dead process
+JOB_STALE_AFTER_S = float(os.getenv("JOB_STALE_AFTER_S", "900"))
+# An exclusive job's lease lapses this long after its last renewal
+JOB_LEASE_TTL_S = float(os.getenv("JOB_LEASE_TTL_S", "60"))
+# How often a queued exclusive job retries the lease
+JOB_LEASE_POLL_S = float(os.getenv("JOB_LEASE_POLL_S", "2"))
+# How often a queued exclusive job refreshes updated_at while it waits
+JOB_QUEUED_HEARTBEAT_S = float(os.getenv("JOB_QUEUED_HEARTBEAT_S", str(JOB_LEASE_TTL_S)))
+
+
+class JobContext:
+    """Handed to a job function so it can publish progress while it runs"""
+
+    def __init__(self, db, job_id: str):
+        self.db = db
+        self.job_id = job_id
+        self.request: dict = {}
+
+    async def start(self):
+        """Mark the job running; for a coalesced job this also closes its request to joiners"""
+        job = await self.db[JOBS_COLLECTION].find_one_and_update(
+            {"_id": self.job_id},
+            {"$set": {"status": "running", "started_at": datetime.utcnow(), "updated_at": datetime.utcnow()}},
+            projection={"request": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        self.request = (job or {}).get("request") or {}
+
+    async def update(self, **fields):
+        fields["updated_at"] = datetime.utcnow()
+        await self.db[JOBS_COLLECTION].update_one({"_id": self.job_id}, {"$set": fields})
+
+    async def progress(self, **progress):
+        await self.update(**{f"progress.{key}": value for key, value in progress.items()})
+
+
+JobFn = Callable[[JobContext], Awaitable[Optional[dict]]]
+
+
+async def _try_lease(db, kind: str, job_id: str) -> bool:
+    """Take (or renew) the lease of `kind` for job_id unless another live job holds it"""
+    now = datetime.utcnow()
+    try:
+        await db[JOB_LEASES_COLLECTION].update_one(
+            {"_id": kind, "$or": [{"holder": job_id}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"holder": job_id, "expires_at": now + timedelta(seconds=JOB_LEASE_TTL_S)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False   # held by another job: the filter missed and the upsert collided
+    return True
+
+
+async def _release_lease(db, kind: str, job_id: str):
+    await db[JOB_LEASES_COLLECTION].delete_one({"_id": kind, "holder": job_id})
+
+
+async def _heartbeat_queued(ctx: JobContext, kind: str):
+    """Touch a queued job while it waits, so it never looks abandoned"""
+    while True:
+        await asyncio.sleep(JOB_QUEUED_HEARTBEAT_S)
+        try:
+            await ctx.update(waiting_for=kind)
+        except Exception as e:
+            print(f"⚠️ Could not heartbeat queued job {ctx.job_id}: {e}")
+
+
+@asynccontextmanager
+async def _exclusive(db, kind: str, ctx: JobContext, lock: asyncio.Lock):
+    """Hold the per-kind lock and lease for the duration of one job"""
+    # Waiting on the lock or the lease can outlast JOB_STALE_AFTER_S; keep
+    # fail_interrupted_jobs and the upload ledger from taking the job for dead
+    waiting = asyncio.create_task(_heartbeat_queued(ctx, kind))
+    try:
+        async with lock:
+            while not await _try_lease(db, kind, ctx.job_id):
+                await asyncio.sleep(JOB_LEASE_POLL_S)
+            waiting.cancel()
+
+            async def renew():
+                while True:
+                    await asyncio.sleep(JOB_LEASE_TTL_S / 3)
+                    try:
+                        await _try_lease(db, kind, ctx.job_id)
+                    except Exception as e:
+                        print(f"⚠️ Could not renew {kind} lease of job {ctx.job_id}: {e}")
+
+            renewer = asyncio.create_task(renew())
+            try:
+                yield
+            finally:
+                renewer.cancel()
+                try:
+                    await _release_lease(db, kind, ctx.job_id)
+                except Exception as e:
+                    # The lease simply expires after JOB_LEASE_TTL_S
+                    print(f"⚠️ Could not release {kind} lease of job {ctx.job_id}: {e}")
+    finally:
+        waiting.cancel()
+
+
+class JobRunner:
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._exclusive_locks: Dict[str, asyncio.Lock] = {}
+
+    async def submit(self, db, kind: str, fn: JobFn, job_id: Optional[str] = None,
+                     exclusive: bool = False, **meta) -> str:
+        """
+        Record a queued job and start it in the background; returns its id.
+        With exclusive=True the job stays queued until no other job of the
+        same kind is running in any worker.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = datetime.utcnow()
+        await db[JOBS_COLLECTION].insert_one(
+            {**_job_document(job_id, kind, meta, now), "status": "queued", "updated_at": now}
+        )
+        self._start(db, job_id, kind, fn, exclusive)
+        return job_id
+
+    async def submit_coalesced(self, db, key: str, kind: str, fn: JobFn, request: dict, **meta) -> str:
+        """
+        Queue fn under `key` unless a run for it is already queued in some
+        worker; either way `request` (a Mongo update on the job's "request"
+        field, e.g. an $addToSet) is merged into the queued run, whose id is
+        returned. fn reads the merged request from ctx.request. Runs hold the
+        `kind` lease, so they never overlap, and a request made while one is
+        executing queues exactly one follow-up.
+        """
+        while True:
+            now = datetime.utcnow()
+            # A queued run whose process died would swallow requests forever
+            await self._fail_dead_coalesced(db, key, now)
+            job_id = uuid.uuid4().hex
+            update = {operator: dict(fields) for operator, fields in request.items()}
+            update.setdefault("$set", {})["requested_at"] = now
+            update["$setOnInsert"] = {**_job_document(job_id, kind, meta, now), "updated_at": now}
+            try:
+                job = await db[JOBS_COLLECTION].find_one_and_update(
+                    {"coalesce_key": key, "status": "queued"},
+                    update,
+                    projection={"_id": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                continue   # another worker queued the run first: join it
+            if job["_id"] == job_id:
+                self._start(db, job_id, kind, fn, exclusive=True, delay=JOB_COALESCE_DELAY_S)
+            return job["_id"]
+
+    async def _fail_dead_coalesced(self, db, key: str, now: datetime):
+        # Queued runs refresh updated_at every JOB_QUEUED_HEARTBEAT_S; joiners never touch it
+        silent_since = now - timedelta(seconds=JOB_COALESCE_DELAY_S + 3 * JOB_QUEUED_HEARTBEAT_S)
+        await db[JOBS_COLLECTION].update_many(
+            {"coalesce_key": key, "status": "queued", "updated_at": {"$lt": silent_since}},
+            {"$set": {"status": "failed", "error": "Queued run was abandoned", "finished_at": now, "updated_at": now}}
+        )
+
+    def _start(self, db, job_id: str, kind: str, fn: JobFn, exclusive: bool, delay: float = 0.0):
+        lock = self._exclusive_locks.setdefault(kind, asyncio.Lock()) if exclusive else None
+        task = asyncio.create_task(self._run(db, job_id, kind, fn, lock, delay))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, db, job_id: str, kind: str, fn: JobFn, lock: Optional[asyncio.Lock] = None,
+                   delay: float = 0.0):
+        ctx = JobContext(db, job_id)
+        try:
+            if delay:
+                # Give more requests the chance to join before the run starts
+                await asyncio.sleep(delay)
+            if lock is not None:
+                async with _exclusive(db, kind, ctx, lock):
+                    await ctx.start()
+                    result = await fn(ctx)
+            else:
+                await ctx.start()
+                result = await fn(ctx)
+            await ctx.update(status="completed", result=result, finished_at=datetime.utcnow())
+            print(f"✅ Job {kind} {job_id} completed")
+        except asyncio.CancelledError:
+            print(f"❌ Job {kind} {job_id} cancelled")
+            try:
+                await ctx.update(status="failed", error="Cancelled", finished_at=datetime.utcnow())
+            except Exception as update_error:
+                print(f"❌ Could not record cancellation of job {job_id}: {update_error}")
+            raise
+        except Exception as e:
+            # HTTPException carries its message in .detail
+            error = str(getattr(e, "detail", "") or e)
+            print(f"❌ Job {kind} {job_id} failed: {error}")
+            try:
+                await ctx.update(status="failed", error=error, finished_at=datetime.utcnow())
+            except Exception as update_error:
+                print(f"❌ Could not record failure of job {job_id}: {update_error}")
+
+
+def _job_document(job_id: str, kind: str, meta: dict, now: datetime) -> dict:
+    return {
+        "_id": job_id,
+        "kind": kind,
+        "meta": meta,
+        "progress": {},
+        "errors": [],
+        "result": None,
+        "created_at": now,
+    }
+
+
+job_runner = JobRunner()
+
+
+async def get_job(db, job_id: str) -> Optional[dict]:
+    return await db[JOBS_COLLECTION].find_one({"_id": job_id})
+
+
+async def fail_interrupted_jobs(db) -> int:
+    """
+    Mark jobs that a previous process left queued/running as failed. Only
+    jobs silent for JOB_STALE_AFTER_S are touched, so jobs of other live
+    workers are left alone.
+    """
+    now = datetime.utcnow()
+    stale = {"status": {"$in": ["queued", "running"]},
+             "updated_at": {"$lt": now - timedelta(seconds=JOB_STALE_AFTER_S)}}
+    job_ids = [job["_id"] async for job in db[JOBS_COLLECTION].find(stale, {"_id": 1})]
+    if not job_ids:
+        return 0
+    result = await db[JOBS_COLLECTION].update_many(
+        {**stale, "_id": {"$in": job_ids}},
+        {"$set": {"status": "failed", "error": "Interrupted by a server restart",
+                  "finished_at": now, "updated_at": now}}
+    )
+    # Their uploads never finished either; a re-upload of the same file must apply it
+    await fail_uploads_of_jobs(db, job_ids)
+    if result.modified_count:
+        print(f"⚠️ Marked {result.modified_count} interrupted jobs as failed")
+    return result.modified_count
@@ -0,0 +1,177 @@
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Hashable, List, Optional
+
+# ------------------ 📊 In-memory leaderboard engine ------------------
+# Ranked boards are held in memory as order-statistics structures: a list of
+# entries kept sorted by a key, a parallel list of keys for bisect, and an id
+# -> entry map. rank_of() is a dict lookup plus a bisect (O(log n)); top(),
+# page() and neighbors() are a bisect plus a slice of the requested size.
+# Mongo stays the durable copy; the boards are loaded at startup and updated
+# from the same writes that update Mongo.
+
+EVAL_LEADERBOARD_REFRESH_S = float(os.getenv("EVAL_LEADERBOARD_REFRESH_S", "30"))
+
+
+class RankedBoard:
+    """Entries sorted by sort_key, addressed by id_field; ranks are 1-based positions"""
+
+    def __init__(self, entries: List[dict], id_field: str, sort_key: Callable[[dict], tuple]):
+        self._id_field = id_field
+        self._sort_key = sort_key
+        self._entries = sorted(entries, key=sort_key)
+        self._keys = [sort_key(e) for e in self._entries]
+        self._by_id = {e[id_field]: e for e in self._entries}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry_id: Hashable) -> bool:
+        return entry_id in self._by_id
+
+    def entries(self) -> List[dict]:
+        return self._entries
+
+    def get(self, entry_id: Hashable) -> Optional[dict]:
+        return self._by_id.get(entry_id)
+
+    def _remove(self, entry: dict) -> int:
+        index = bisect_left(self._keys, self._sort_key(entry))
+        del self._keys[index]
+        del self._entries[index]
+        del self._by_id[entry[self._id_field]]
+        return index
+
+    def _insert(self, entry: dict) -> int:
+        key = self._sort_key(entry)
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, entry)
+        self._by_id[entry[self._id_field]] = entry
+        return index
+
+    def upsert(self, entry: dict) -> int:
+        """Insert or move an entry; returns its new rank"""
+        old = self._by_id.get(entry[self._id_field])
+        if old is not None:
+            self._remove(old)
+        return self._insert(entry) + 1
+
+    def remove(self, entry_id: Hashable) -> bool:
+        old = self._by_id.get(entry_id)
+        if old is None:
+            return False
+        self._remove(old)
+        return True
+
+    def rank_of(self, entry_id: Hashable) -> Optional[int]:
+        entry = self._by_id.get(entry_id)
+        if entry is None:
+            return None
+        return bisect_left(self._keys, self._sort_key(entry)) + 1
+
+    def _ranked(self, start: int, stop: int) -> List[dict]:
+        return [{**entry, "rank": index + 1}
+                for index, entry in enumerate(self._entries[start:stop], start=start)]
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        offset = max(offset, 0)
+        stop = len(self._entries) if limit is None else offset + max(limit, 0)
+        return self._ranked(offset, stop)
+
+    def top(self, n: int) -> List[dict]:
+        return self.page(0, n)
+
+    def neighbors(self, entry_id: Hashable, k: int = 2) -> Optional[dict]:
+        """The entry with up to k entries ranked directly above and below it"""
+        rank = self.rank_of(entry_id)
+        if rank is None:
+            return None
+        index = rank - 1
+        return {
+            "entry": self._ranked(index, index + 1)[0],
+            "above": self._ranked(max(index - k, 0), index),
+            "below": self._ranked(index + 1, index + 1 + k),
+        }
+
+
+# ------------------ Evaluation leaderboards (one per round) ------------------
+# Ranked by the average total score across judges, from the running sums in
+# evaluation_summary. Writes in this process update the board directly; the
+# board is reloaded after EVAL_LEADERBOARD_REFRESH_S so writes handled by
+# other workers show up too.
+
+def evaluation_sort_key(entry: dict) -> tuple:
+    return (-entry["total_score"], entry["team_name"], entry["team_id"])
+
+
+def evaluation_entry(summary: dict) -> Optional[dict]:
+    """Leaderboard row for one evaluation_summary document (None once it has no evaluations)"""
+    count = summary.get("total_evaluations", 0)
+    if count <= 0:
+        return None
+    return {
+        "team_id": summary["team_id"],
+        "team_name": summary.get("team_name") or "",
+        "total_score": round(summary.get("sum_total_score", 0.0) / count, 2),
+        "evaluation_count": count,
+    }
+
+
+_evaluation_boards: Dict[int, dict] = {}   # round_id -> {"board": RankedBoard, "loaded_at": float}
+
+
+def _new_evaluation_board(summaries: List[dict]) -> RankedBoard:
+    entries = [e for e in (evaluation_entry(s) for s in summaries) if e is not None]
+    return RankedBoard(entries, "team_id", evaluation_sort_key)
+
+
+async def load_evaluation_boards(collection, round_id: Optional[int] = None) -> int:
+    """(Re)load the boards of every round, or just `round_id`, from evaluation_summary"""
+    query = {} if round_id is None else {"round_id": round_id}
+    by_round: Dict[int, List[dict]] = {}
+    async for summary in collection.find(query, {"_id": 0, "sum_scores": 0}):
+        by_round.setdefault(summary["round_id"], []).append(summary)
+    if round_id is None:
+        _evaluation_boards.clear()
+    elif round_id not in by_round:
+        by_round[round_id] = []
+    now = time.monotonic()
+    for rid, summaries in by_round.items():
+        _evaluation_boards[rid] = {"board": _new_evaluation_board(summaries), "loaded_at": now}
+    return sum(len(slot["board"]) for slot in _evaluation_boards.values())
+
+
+async def get_evaluation_board(collection, round_id: int) -> RankedBoard:
+    slot = _evaluation_boards.get(round_id)
+    if slot is None or time.monotonic() - slot["loaded_at"] > EVAL_LEADERBOARD_REFRESH_S:
+        await load_evaluation_boards(collection, round_id)
+        slot = _evaluation_boards[round_id]
+    return slot["board"]
+
+
+def apply_evaluation_summary(summary: dict) -> dict:
+    """
+    Move one team on its round's board after its summary changed in Mongo.
+    Returns the delta for live subscribers: the team's old rank and its new
+    entry (None once it has no evaluations left). Teams between the two
+    ranks shift by one place.
+    """
+    entry = evaluation_entry(summary)
+    delta = {"round_id": summary["round_id"], "team_id": summary["team_id"], "old_rank": None, "entry": entry}
+    slot = _evaluation_boards.get(summary["round_id"])
+    if slot is None:
+        # Not loaded yet; the first read loads it from Mongo
+        return delta
+    board = slot["board"]
+    delta["old_rank"] = board.rank_of(summary["team_id"])
+    if entry is None:
+        board.remove(summary["team_id"])
+    else:
+        delta["entry"] = {**entry, "rank": board.upsert(entry)}
+    return delta
+
+
+def invalidate_evaluation_boards():
+    _evaluation_boards.clear()
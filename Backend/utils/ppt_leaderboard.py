@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import DeleteOne, UpdateOne
+
+from utils.leaderboard_engine import RankedBoard
+
+# ------------------ 🏆 Incremental PPT leaderboard ------------------
+# The board is kept as a list sorted by (-total_weighted, team_name), mirrored
+# in the `leaderboard` collection. When an upload changes a few teams only
+# their totals are recomputed; they are moved inside the sorted list and only
+# rows whose total or rank actually changed are written back. The version
+# pointer in `settings` moves only after the rows are written, so a worker
+# that reloads on a version change always reads a complete board. Readers
+# re-check the pointer at most every PPT_LEADERBOARD_CHECK_S, like the
+# evaluation boards' refresh, so a GET is served from memory.
+
+LEADERBOARD_COLLECTION = "leaderboard"
+LEADERBOARD_META_ID = "ppt_leaderboard"   # version pointer in the settings collection
+
+# How long readers trust the cached board before re-reading the version pointer
+PPT_LEADERBOARD_CHECK_S = float(os.getenv("PPT_LEADERBOARD_CHECK_S", "5"))
+
+_cache = {"board": None, "version": None, "checked_at": 0.0}
+# Held across load/apply/write/commit of one leaderboard update in this worker
+board_lock = asyncio.Lock()
+
+
+def board_sort_key(entry: dict) -> tuple:
+    return (-entry["total_weighted"], entry["team_name"])
+
+
+class SortedBoard(RankedBoard):
+    """The PPT board: RankedBoard keyed on team_name that also tracks the persisted rank"""
+
+    def __init__(self, entries: List[dict]):
+        super().__init__([{"team_name": e["team_name"], "total_weighted": e["total_weighted"],
+                           "rank": e.get("rank")} for e in entries], "team_name", board_sort_key)
+
+    def apply(self, totals: Dict[str, Optional[float]]) -> Tuple[List[str], List[dict]]:
+        """
+        Move each team to its new total (None removes it). Returns the removed
+        team names and the entries whose total or rank changed. Only entries
+        at or after the first touched position can change rank.
+        """
+        removed, changed = [], {}
+        first_touched = len(self._entries)
+        for team, total in totals.items():
+            old = self._by_id.get(team)
+            if old is not None and total is not None and old["total_weighted"] == total:
+                continue
+            if old is not None:
+                first_touched = min(first_touched, self._remove(old))
+                if total is None:
+                    removed.append(team)
+            if total is not None:
+                entry = {"team_name": team, "total_weighted": total, "rank": None}
+                first_touched = min(first_touched, self._insert(entry))
+                changed[team] = entry
+
+        for index in range(first_touched, len(self._entries)):
+            entry = self._entries[index]
+            if entry["rank"] != index + 1:
+                entry["rank"] = index + 1
+                changed[entry["team_name"]] = entry
+        return removed, list(changed.values())
+
+
+def leaderboard_operations(removed: List[str], changed: List[dict]) -> list:
+    """The minimal bulk_write for one SortedBoard.apply() result"""
+    operations = [DeleteOne({"team_name": team}) for team in removed]
+    operations.extend(
+        UpdateOne(
+            {"team_name": entry["team_name"]},
+            {"$set": {"total_weighted": entry["total_weighted"], "rank": entry["rank"]}},
+            upsert=True
+        )
+        for entry in changed
+    )
+    return operations
+
+
+async def load_board(db, fresh: bool = False) -> Tuple[SortedBoard, Optional[str]]:
+    """
+    (board, version) from memory. The version pointer is re-read once the
+    cache is PPT_LEADERBOARD_CHECK_S old, or always with fresh=True (writers
+    need the current version), and the rows only if another worker moved it on.
+    """
+    now = time.monotonic()
+    if not fresh and _cache["board"] is not None and now - _cache["checked_at"] < PPT_LEADERBOARD_CHECK_S:
+        return _cache["board"], _cache["version"]
+    meta = await db["settings"].find_one({"_id": LEADERBOARD_META_ID})
+    version = meta.get("version") if meta else None
+    if _cache["board"] is None or _cache["version"] != version:
+        rows = await db[LEADERBOARD_COLLECTION].find({}, {"_id": 0}).sort("rank", 1).to_list(None)
+        _cache.update(board=SortedBoard(rows), version=version)
+    _cache["checked_at"] = now
+    return _cache["board"], version
+
+
+async def claim_version(db, expected: Optional[str]) -> Optional[str]:
+    """
+    Move the board version from `expected` to a new one once the rows are
+    written; None if another worker moved it meanwhile (its writes may have
+    interleaved with ours, so the caller falls back to a full rebuild).
+    """
+    new_version = uuid.uuid4().hex
+    fields = {"version": new_version, "updated_at": datetime.utcnow()}
+    if expected is None:
+        try:
+            await db["settings"].insert_one({"_id": LEADERBOARD_META_ID, **fields})
+        except Exception:
+            return None
+        return new_version
+    result = await db["settings"].update_one({"_id": LEADERBOARD_META_ID, "version": expected}, {"$set": fields})
+    return new_version if result.modified_count else None
+
+
+async def publish_full_board(db, results: List[dict]) -> None:
+    """Record a fully rebuilt board as the current version"""
+    version = uuid.uuid4().hex
+    await db["settings"].update_one(
+        {"_id": LEADERBOARD_META_ID},
+        {"$set": {"version": version, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    _cache.update(board=SortedBoard(results), version=version, checked_at=time.monotonic())
+
+
+def commit_board(version: str):
+    """The cached board (already updated in place) now matches `version`"""
+    _cache.update(version=version, checked_at=time.monotonic())
+
+
+def invalidate_board():
+    _cache.update(board=None, version=None, checked_at=0.0)
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo.errors import BulkWriteError
+
+# Materialized judge-facing roster built from FinalTeamandpsdetails.
+# The source only changes when an admin re-uploads the spreadsheet, so the
+# transformed rows are stored once in ROSTER_COLLECTION (tagged with a
+# roster_version) and served to judges from an in-process cache.
+
+ROSTER_COLLECTION = "judge_team_roster"
+ROSTER_META_ID = "judge_team_roster"   # pointer document in the settings collection
+ROSTER_CACHE_TTL_S = float(os.getenv("ROSTER_CACHE_TTL_S", "60"))
+# Rows of a replaced version are kept this long, so workers still serving it
+# from cache (up to ROSTER_CACHE_TTL_S) can finish their paged queries
+ROSTER_RETAIN_S = float(os.getenv("ROSTER_RETAIN_S", str(2 * ROSTER_CACHE_TTL_S)))
+
+_cache = {"teams": None, "etag": None, "checked_at": 0.0}
+# One build at a time in this worker; across workers the unique
+# (roster_version, position) index makes concurrent builds of a version converge
+_build_lock = asyncio.Lock()
+
+
+def transform_team(team: dict) -> dict:
+    """Map one FinalTeamandpsdetails row to the structure the judge panel renders"""
+    # Create team members array from individual member fields
+    team_members = []
+    for i in range(1, 6):  # Check for members 1-5
+        member_name = team.get(f'Team member-{i} name')
+        if member_name and str(member_name).strip() and str(member_name).lower() != 'nan':
+            team_members.append({
+                "name": str(member_name).strip(),
+                "roll_no": "N/A",
+                "email": "N/A",
+                "contact": "N/A",
+                "role": f"Member {i}"
+            })
+
+    # Create problem statement object
+    problem_statement = {
+        "ps_id": str(team.get('PSID', 'N/A')),
+        "title": str(team.get('Problem Statement Name', 'N/A')),
+        "description": str(team.get('Problem Statement Description as it is in SIH Website', 'N/A')),
+        "category": str(team.get('Select Category ', 'N/A')),
+        "difficulty": "N/A",
+        "domain": "N/A"
+    }
+
+    return {
+        "team_id": str(team.get('Team ID', 'N/A')),
+        "team_name": str(team.get('Team Name', 'N/A')),
+        "college": "GLA University",  # Default since not in FinalTeamandpsdetails
+        "department": "N/A",
+        "year": "N/A",
+        "team_leader": {
+            "name": str(team.get('Team Leader Name', 'N/A')),
+            "roll_no": str(team.get('University Roll No', 'N/A')),
+            "email": str(team.get('Team Leader Email id (gla email id only)', 'N/A')),
+            "contact": str(team.get('Team Leader Contact No.', 'N/A')),
+            "role": "Team Leader"
+        },
+        "team_members": team_members,
+        "problem_statement": problem_statement,
+        "mentor": None,
+        "status": "active"
+    }
+
+
+def _roster_etag(teams: list) -> str:
+    payload = json.dumps(teams, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def invalidate_team_roster_cache():
+    """Drop the in-process copy so the next read reloads it"""
+    _cache.update(teams=None, etag=None, checked_at=0.0)
+
+
+async def rebuild_team_roster(db) -> dict:
+    """
+    Re-materialize the roster from FinalTeamandpsdetails. Call after the
+    spreadsheet is re-uploaded. New rows are written under a new version and
+    the pointer is flipped before old rows are removed, so readers never see
+    a half-written roster; replaced versions stay for ROSTER_RETAIN_S.
+    """
+    async with _build_lock:
+        return await _build_team_roster(db)
+
+
+async def _build_team_roster(db) -> dict:
+    teams = [transform_team(team) async for team in db.FinalTeamandpsdetails.find({})]
+    etag = _roster_etag(teams)
+    now = datetime.utcnow()
+
+    meta = await db["settings"].find_one({"_id": ROSTER_META_ID}) or {}
+    if meta.get("etag") == etag:
+        # Same content as the live version: nothing to rewrite
+        _cache.update(teams=teams, etag=etag, checked_at=time.monotonic())
+        print(f"✅ Judge team roster unchanged ({len(teams)} teams)")
+        return {"etag": etag, "count": len(teams)}
+
+    roster = db[ROSTER_COLLECTION]
+    if teams:
+        # Rows left by an interrupted or concurrent build of this version are
+        # identical, so only the missing positions need to land
+        try:
+            await roster.insert_many(
+                [{**team, "roster_version": etag, "position": i} for i, team in enumerate(teams)],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    retired = [r for r in meta.get("retired", []) if now - r["retired_at"] < timedelta(seconds=ROSTER_RETAIN_S)]
+    if meta.get("etag"):
+        retired.append({"etag": meta["etag"], "retired_at": now})
+    await db["settings"].update_one(
+        {"_id": ROSTER_META_ID},
+        {"$set": {"etag": etag, "count": len(teams), "built_at": now, "retired": retired}},
+        upsert=True
+    )
+    keep = [etag] + [r["etag"] for r in retired]
+    await roster.delete_many({"roster_version": {"$nin": keep}})
+
+    _cache.update(teams=teams, etag=etag, checked_at=time.monotonic())
+    print(f"✅ Judge team roster rebuilt with {len(teams)} teams")
+    return {"etag": etag, "count": len(teams)}
+
+
+async def get_team_roster(db, refresh: bool = False) -> tuple:
+    """
+    Return (teams, etag). Served from memory; the pointer document is
+    re-checked at most every ROSTER_CACHE_TTL_S seconds (or now, with
+    refresh) so a rebuild in another worker is picked up. Built lazily on
+    first use.
+    """
+    now = time.monotonic()
+    if not refresh and _cache["teams"] is not None and now - _cache["checked_at"] < ROSTER_CACHE_TTL_S:
+        return _cache["teams"], _cache["etag"]
+
+    meta = await db["settings"].find_one({"_id": ROSTER_META_ID})
+    if not meta:
+        async with _build_lock:
+            # Concurrent cold-start requests wait for the first build instead of repeating it
+            if _cache["teams"] is None:
+                await _build_team_roster(db)
+        return _cache["teams"], _cache["etag"]
+
+    if meta["etag"] != _cache["etag"]:
+        teams = await db[ROSTER_COLLECTION].find(
+            {"roster_version": meta["etag"]},
+            {"_id": 0, "roster_version": 0, "position": 0}
+        ).sort("position", 1).to_list(None)
+        _cache.update(teams=teams, etag=meta["etag"])
+    _cache["checked_at"] = now
+    return _cache["teams"], _cache["etag"]
+
+
+# Top-level fields a client may request through ?fields=
+ROSTER_FIELDS = {
+    "team_id", "team_name", "college", "department", "year", "team_leader",
+    "team_members", "problem_statement", "mentor", "status",
+}
+
+
+def parse_roster_fields(fields: Optional[str]) -> Optional[dict]:
+    """
+    Turn "team_id,team_name,problem_statement.title" into a Mongo projection.
+    Returns None for "all fields"; raises ValueError on unknown fields.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f.split(".", 1)[0] not in ROSTER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    projection = {f: 1 for f in requested}
+    projection.update({"_id": 0, "position": 1})
+    return projection
+
+
+async def query_team_roster(
+    db,
+    version: str,
+    category: Optional[str] = None,
+    ps_id: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = 50,
+    projection: Optional[dict] = None
+) -> tuple:
+    """
+    One page of the materialized roster with filters and projection pushed
+    down to Mongo. Returns (teams, last_position or None when exhausted).
+    """
+    query = {"roster_version": version}
+    if category:
+        query["problem_statement.category"] = category
+    if ps_id:
+        query["problem_statement.ps_id"] = ps_id
+    if after is not None:
+        query["position"] = {"$gt": after}
+    if projection is None:
+        projection = {"_id": 0, "roster_version": 0}
+
+    docs = await db[ROSTER_COLLECTION].find(query, projection).sort("position", 1).limit(limit + 1).to_list(None)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    last_position = docs[-1]["position"] if has_more else None
+    for doc in docs:
+        doc.pop("position", None)
+    return docs, last_position
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers the given (strong) ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
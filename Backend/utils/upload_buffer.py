@@ -0,0 +1,132 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+# ------------------ 📥 Upload ingestion ------------------
+# Every spreadsheet upload goes through ingest_upload(): the multipart body is
+# streamed in fixed-size reads into an UploadBuffer that stays in memory for
+# small sheets and spills to a temp file past UPLOAD_SPOOL_BYTES. The size cap
+# is enforced twice: on Content-Length before the body is read (middleware)
+# and on the running byte count while streaming.
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+# Room for multipart boundaries and the other form fields
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadBuffer:
+    """Seekable binary buffer: in memory up to spool_bytes, then a named temp file"""
+
+    def __init__(self, spool_bytes: int = UPLOAD_SPOOL_BYTES, suffix: str = ""):
+        self._spool_bytes = spool_bytes
+        self._suffix = suffix
+        self._file = io.BytesIO()
+        self.path: Optional[str] = None
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def write(self, data: bytes):
+        if self.in_memory and self.size + len(data) > self._spool_bytes:
+            self._rollover()
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    @property
+    def sha256(self) -> str:
+        """Content fingerprint, computed while the upload streamed in"""
+        return self._hash.hexdigest()
+
+    def _rollover(self):
+        disk = tempfile.NamedTemporaryFile(prefix="upload_", suffix=self._suffix, delete=False)
+        disk.write(self._file.getbuffer())
+        self._file.close()
+        self._file = disk
+        self.path = disk.name
+
+    def open(self):
+        """The buffer itself, rewound, for parsers that take a file object"""
+        self._file.flush()
+        self._file.seek(0)
+        return self._file
+
+    def source(self) -> str:
+        """
+        A path worker processes can open. An upload still in memory is
+        spilled to its temp file once here, rather than copied and pickled
+        to every worker; callers that can read a file object should use
+        open() instead while in_memory.
+        """
+        if self.in_memory:
+            self._rollover()
+        self._file.flush()
+        return self.path
+
+    def close(self):
+        self._file.close()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum upload size is {max_bytes // (1024 * 1024)} MB"
+    )
+
+
+async def ingest_upload(file: UploadFile, max_bytes: Optional[int] = None,
+                        spool_bytes: Optional[int] = None) -> UploadBuffer:
+    """
+    Stream an UploadFile into an UploadBuffer, raising 413 as soon as the
+    running size passes max_bytes. The caller owns (and must close) the buffer.
+    """
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    declared = getattr(file, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise _too_large(max_bytes)
+
+    suffix = os.path.splitext(file.filename or "")[1]
+    buffer = UploadBuffer(spool_bytes or UPLOAD_SPOOL_BYTES, suffix=suffix)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            if buffer.size + len(chunk) > max_bytes:
+                raise _too_large(max_bytes)
+            buffer.write(chunk)
+    except BaseException:
+        buffer.close()
+        raise
+    return buffer
+
+
+async def reject_oversized_uploads(request, call_next):
+    """HTTP middleware: refuse multipart bodies whose Content-Length is over the cap before reading them"""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD_BYTES:
+            error = _too_large(UPLOAD_MAX_BYTES)
+            return JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+    return await call_next(request)
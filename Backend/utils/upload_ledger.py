@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# ------------------ 🧾 Upload ledger ------------------
+# One document per accepted upload in the `uploads` collection, fingerprinted
+# by the sha256 of the file. If the latest upload of a kind has the same hash,
+# a re-upload is a no-op: the previous job (and its result) is returned.
+
+UPLOADS_COLLECTION = "uploads"
+
+
+async def find_identical_upload(db, kind: str, sha256: str) -> Optional[dict]:
+    """
+    The ledger entry to reuse for this file, if any: only when the most
+    recent non-failed upload of this kind has the same content, so A -> B -> A
+    still re-applies A. Entries whose job died (failed, or silent past
+    JOB_STALE_AFTER_S) are marked failed on the way.
+    """
+    from utils.jobs import JOBS_COLLECTION, JOB_STALE_AFTER_S
+
+    while True:
+        latest = await db[UPLOADS_COLLECTION].find_one(
+            {"kind": kind, "status": {"$ne": "failed"}},
+            sort=[("created_at", -1)]
+        )
+        if latest is None or latest["status"] != "processing":
+            break
+        # A "processing" entry only counts while its job can still finish:
+        # not failed, and (if unfinished) heard from within JOB_STALE_AFTER_S
+        job = await db[JOBS_COLLECTION].find_one({"_id": latest["job_id"]}, {"status": 1, "updated_at": 1})
+        if job and job["status"] == "completed":
+            break
+        if (job and job["status"] in ("queued", "running")
+                and datetime.utcnow() - job["updated_at"] < timedelta(seconds=JOB_STALE_AFTER_S)):
+            break
+        await finish_upload(db, latest["_id"], "failed")
+    if latest and latest["sha256"] == sha256:
+        return latest
+    return None
+
+
+async def record_upload(db, kind: str, sha256: str, filename: str, size: int, job_id: str, **meta) -> None:
+    now = datetime.utcnow()
+    await db[UPLOADS_COLLECTION].insert_one({
+        "_id": job_id,
+        "kind": kind,
+        "sha256": sha256,
+        "filename": filename,
+        "size": size,
+        "job_id": job_id,
+        "status": "processing",
+        "meta": meta,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+
+async def finish_upload(db, job_id: str, status: str, diff: Optional[dict] = None) -> None:
+    """Mark a ledger entry completed/failed once its job is done"""
+    fields = {"status": status, "updated_at": datetime.utcnow()}
+    if diff is not None:
+        fields["diff"] = diff
+    await db[UPLOADS_COLLECTION].update_one({"_id": job_id}, {"$set": fields})
+
+
+async def fail_uploads_of_jobs(db, job_ids: List[str]) -> int:
+    """Mark the ledger entries of jobs that died (restart, cancellation) failed, so their files can be re-applied"""
+    if not job_ids:
+        return 0
+    result = await db[UPLOADS_COLLECTION].update_many(
+        {"job_id": {"$in": job_ids}, "status": "processing"},
+        {"$set": {"status": "failed", "updated_at": datetime.utcnow()}}
+    )
+    return result.modified_count
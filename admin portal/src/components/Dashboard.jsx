@@ -14,6 +14,8 @@ import {
   Database
 } from 'lucide-react';
 import './Dashboard.css';
+import { waitForJob } from '../jobs';
+import { subscribeEvents, applyLeaderboardDelta } from '../events';
 
 const Dashboard = () => {
   const [isUploading, setIsUploading] = useState(false);
@@ -34,6 +36,8 @@ const Dashboard = () => {
   const [pptAppliedSearch, setPptAppliedSearch] = useState('');
   const [pptTopN, setPptTopN] = useState(5);
   const [pptShowAll, setPptShowAll] = useState(false);
+  // Bumped to re-fetch the whole PPT leaderboard (full rebuild or missed events)
+  const [pptReload, setPptReload] = useState(0);
 
   useEffect(() => {
     const fetchPPTLeaderboard = async () => {
@@ -51,11 +55,10 @@ const Dashboard = () => {
       }
     };
     fetchPPTLeaderboard();
-  }, []);
+  }, [pptReload]);
 
   useEffect(() => {
     let isMounted = true;
-    let intervalId;
 
     const fetchActiveRound = async () => {
       try {
@@ -70,14 +73,31 @@ const Dashboard = () => {
       } catch {}
     };
 
-    // initial fetch
     fetchActiveRound();
-    // poll every 5s
-    intervalId = setInterval(fetchActiveRound, 5000);
+    let connectedOnce = false;
+    // Live updates instead of polling; re-fetch in full whenever the stream reconnects
+    const close = subscribeEvents(['active_round', 'leaderboard'], {
+      active_round: (data) => isMounted && setActiveRound(data.round),
+      leaderboard: (delta) => {
+        if (!isMounted) return;
+        if (delta.reset) setPptReload((n) => n + 1);
+        else setPptLeaders((rows) => applyLeaderboardDelta(rows, delta));
+      }
+    }, {
+      onReconnect: () => {
+        // The first connection follows the initial fetches; only later ones can have missed events
+        if (!connectedOnce) {
+          connectedOnce = true;
+          return;
+        }
+        fetchActiveRound();
+        setPptReload((n) => n + 1);
+      }
+    });
 
     return () => {
       isMounted = false;
-      if (intervalId) clearInterval(intervalId);
+      close();
     };
   }, []);
 
@@ -235,12 +255,22 @@ const Dashboard = () => {
         body: formData,
       });
 
-      const result = await response.json();
+      const accepted = await response.json();
 
       if (response.ok) {
+        // Processing runs as a background job; poll it for progress
+        const job = await waitForJob(accepted.job_id, {
+          onProgress: (job) => {
+            const processed = job.progress?.records_processed;
+            setUploadStatus({
+              type: 'info',
+              message: processed ? `Processing... ${processed} records read.` : 'Processing upload...'
+            });
+          }
+        });
         setUploadStatus({ 
           type: 'success', 
-          message: `Successfully updated! ${result.total_records} records processed.` 
+          message: `Successfully updated! ${job.result.total_records} records processed.` 
         });
         setLastUpdate(new Date().toLocaleString());
         setSelectedFile(null);
@@ -250,13 +280,13 @@ const Dashboard = () => {
       } else {
         setUploadStatus({ 
           type: 'error', 
-          message: result.detail || result.error || 'Upload failed. Please try again.' 
+          message: accepted.detail || accepted.error || 'Upload failed. Please try again.' 
         });
       }
     } catch (error) {
       setUploadStatus({ 
         type: 'error', 
-        message: 'Network error. Please check your connection.' 
+        message: error.message || 'Network error. Please check your connection.' 
       });
     } finally {
       setIsUploading(false);
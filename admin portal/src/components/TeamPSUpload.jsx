@@ -1,6 +1,7 @@
 import React, { useState } from "react";
 import * as XLSX from "xlsx";
 import "./ExcelUpload.css"; // Reusing the existing CSS
+import { waitForJob } from "../jobs";
 
 const TeamPSUpload = () => {
   const [excelData, setExcelData] = useState([]);
@@ -93,14 +94,26 @@ const TeamPSUpload = () => {
         },
       );
 
-      const result = await response.json();
+      const accepted = await response.json();
 
       if (!response.ok) {
         throw new Error(
-          result.detail || "Failed to upload file. Server returned an error.",
+          accepted.detail || "Failed to upload file. Server returned an error.",
         );
       }
 
+      // Rows are processed as a background job; poll it for progress
+      const job = await waitForJob(accepted.job_id, {
+        onProgress: (job) => {
+          const rows = job.progress?.rows_processed;
+          setUploadStatus({
+            type: "info",
+            message: rows ? `Processing... ${rows} rows read.` : "Processing upload...",
+          });
+        },
+      });
+      const result = job.result;
+
       setUploadStatus({
         type: "success",
         message: result.message,
@@ -0,0 +1,33 @@
+import { API_BASE_URL } from './config.js';
+
+// Subscribe to the backend's server-sent events (leaderboard deltas,
+// active-round changes). handlers maps an event name to a callback that
+// receives the parsed payload. onReconnect runs on every (re)connection and
+// on "resync", so callers can re-fetch full state after missing events.
+// Returns a function that closes the stream.
+export const subscribeEvents = (topics, handlers, { onReconnect } = {}) => {
+  const source = new EventSource(`${API_BASE_URL}/events?topics=${topics.join(',')}`);
+  const listen = (name, callback) => {
+    source.addEventListener(name, (event) => callback(JSON.parse(event.data)));
+  };
+  Object.entries(handlers).forEach(([name, callback]) => listen(name, callback));
+  if (onReconnect) {
+    listen('hello', onReconnect);
+    listen('resync', onReconnect);
+  }
+  return () => source.close();
+};
+
+// Apply one "leaderboard" delta to a list of {team_name, total_weighted, rank} rows
+export const applyLeaderboardDelta = (rows, delta) => {
+  const removed = new Set(delta.removed || []);
+  const changed = new Map((delta.changed || []).map((entry) => [entry.team_name, entry]));
+  const next = rows
+    .filter((row) => !removed.has(row.team_name))
+    .map((row) => (changed.has(row.team_name) ? { ...row, ...changed.get(row.team_name) } : row));
+  const known = new Set(next.map((row) => row.team_name));
+  changed.forEach((entry, team) => {
+    if (!known.has(team)) next.push(entry);
+  });
+  return next.sort((a, b) => a.rank - b.rank);
+};
@@ -0,0 +1,23 @@
+import { API_BASE_URL } from './config.js';
+
+// Poll a background upload/rebuild job until it completes or fails.
+// onProgress receives every intermediate job document.
+export const waitForJob = async (jobId, { onProgress, intervalMs = 1000 } = {}) => {
+  for (;;) {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+    const job = await response.json();
+    if (!response.ok) {
+      throw new Error(job.detail || 'Failed to fetch job status');
+    }
+    if (job.status === 'completed') {
+      return job;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Job failed');
+    }
+    if (onProgress) {
+      onProgress(job);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
@@ -8,26 +8,7 @@ from langchain_openai import ChatOpenAI
 
 from utils import get_text_limiter, extract_first_json_object
 
-class FeedbackAgent:
-    class FeedbackOutput(BaseModel):
-        positive: str
-        criticism: str
-        technical: str
-        suggestions: str
-
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found")
-        self.api_key = api_key
-        self.model = os.getenv("OPENAI_MODEL_TEXT", os.getenv("OPENAI_MODEL", "gpt-4o"))
-        self.timeout_s = int(os.getenv("LLM_TIMEOUT_S", "90"))
-        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
-        self.seed = os.getenv("OPENAI_SEED")
-        self.limiter = get_text_limiter()
-        self.parser = JsonOutputParser(pydantic_object=self.FeedbackOutput)
-        self.prompt = ChatPromptTemplate.from_template(
-            """
+FEEDBACK_PROMPT = """
 You are a hackathon mentor. Use BOTH the scoring summary and the diagram summary as evidence.
 Return detailed, research-oriented guidance. Use numbered lists and reference slides/diagrams when possible.
 
@@ -47,7 +28,26 @@ Output JSON:
 Format Instructions: {format_instructions}
 Deck Text: {document_text}
 """
-        )
+
+class FeedbackAgent:
+    class FeedbackOutput(BaseModel):
+        positive: str
+        criticism: str
+        technical: str
+        suggestions: str
+
+    def __init__(self):
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found")
+        self.api_key = api_key
+        self.model = os.getenv("OPENAI_MODEL_TEXT", os.getenv("OPENAI_MODEL", "gpt-4o"))
+        self.timeout_s = int(os.getenv("LLM_TIMEOUT_S", "90"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.seed = os.getenv("OPENAI_SEED")
+        self.limiter = get_text_limiter()
+        self.parser = JsonOutputParser(pydantic_object=self.FeedbackOutput)
+        self.prompt = ChatPromptTemplate.from_template(FEEDBACK_PROMPT)
 
     async def _ainvoke_json(self, messages):
         last_err = None
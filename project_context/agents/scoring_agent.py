@@ -111,12 +111,7 @@ architecture & scalability, latency/cost estimates, risks & mitigations,
 privacy/compliance, security, deployment plan, adoption path.
 """.strip()
 
-class ScoringAgent(_LLMInvoker):
-    def __init__(self):
-        super().__init__()
-        self.parser = JsonOutputParser(pydantic_object=ScoringOutput)
-        self.prompt = ChatPromptTemplate.from_template(
-            """
+SCORING_PROMPT = """
 You are a strict hackathon judge. Use BOTH sources of evidence with equal weight:
 (A) Deck text
 (B) Diagram summary extracted from images (only images classified as diagrams and important)
@@ -151,7 +146,12 @@ Format Instructions:
 Deck Text:
 {document_text}
 """
-        )
+
+class ScoringAgent(_LLMInvoker):
+    def __init__(self):
+        super().__init__()
+        self.parser = JsonOutputParser(pydantic_object=ScoringOutput)
+        self.prompt = ChatPromptTemplate.from_template(SCORING_PROMPT)
 
     async def run(self, context):
         print(f"--- ScoringAgent: {context.file_path} ---")
@@ -186,12 +186,7 @@ Deck Text:
             print(f"  -> ERROR: {e}")
             context.set_error(f"Scoring Agent failed: {e}")
 
-class CombinedAgent(_LLMInvoker):
-    def __init__(self):
-        super().__init__()
-        self.parser = JsonOutputParser(pydantic_object=CombinedOutput)
-        self.prompt = ChatPromptTemplate.from_template(
-            """
+COMBINED_PROMPT = """
 You are a strict hackathon judge and mentor. Use deck text + diagram summary with equal weight.
 Consider only images that are diagrams and marked critical/supporting as core evidence.
 
@@ -222,7 +217,12 @@ Format Instructions:
 Deck Text:
 {document_text}
 """
-        )
+
+class CombinedAgent(_LLMInvoker):
+    def __init__(self):
+        super().__init__()
+        self.parser = JsonOutputParser(pydantic_object=CombinedOutput)
+        self.prompt = ChatPromptTemplate.from_template(COMBINED_PROMPT)
 
     async def run(self, context):
         print(f"--- CombinedAgent: {context.file_path} ---")
@@ -0,0 +1,147 @@
+# artifacts.py
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict
+
+from utils import (
+    _extract_pdf_text_and_embedded,
+    _extract_pptx_text_and_embedded,
+    _iter_pdf_pages_as_images,
+    _render_pptx_slides,
+    _max_render_pages,
+)
+
+# ---------- Render-once deck artifacts ----------
+# Everything derived from a deck's file: text, rendered pages/slides and
+# embedded images, each with its perceptual hash and decorative flag. Built
+# once per deck content and shared by load_document_content (evidence) and
+# DeckImageExtractor (vision input). Kept in memory for the last
+# ARTIFACT_MEMORY_DECKS decks of this process and on disk under
+# ARTIFACT_CACHE_DIR, so other processes and later runs skip rendering too.
+
+ARTIFACT_FORMAT = 1   # bump when the shape of the artifacts changes
+RENDER_DPI = int(os.getenv("RENDER_DPI", "170"))
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(".cache", "artifacts"))
+ARTIFACT_MEMORY_DECKS = int(os.getenv("ARTIFACT_MEMORY_DECKS", "8"))
+ARTIFACT_CACHE_MAX_ENTRIES = int(os.getenv("ARTIFACT_CACHE_MAX_ENTRIES", "500"))
+
+
+def build_deck_artifacts(file_path: str) -> Dict[str, Any]:
+    """Parse and render one deck (the expensive part)"""
+    ext = os.path.splitext(file_path)[1].lower()
+    text, embedded, rendered = "", [], []
+    if ext == ".pdf":
+        text, embedded = _extract_pdf_text_and_embedded(file_path)
+        # Always render pages as well (captures SmartArt/vector)
+        rendered = list(_iter_pdf_pages_as_images(file_path, dpi=RENDER_DPI))
+    elif ext in (".pptx", ".ppt"):
+        text, embedded = _extract_pptx_text_and_embedded(file_path)
+        # Always render slides too
+        rendered = _render_pptx_slides(file_path)
+    return {"text": text, "embedded": embedded, "rendered": rendered}
+
+
+class ArtifactStore:
+    def __init__(self, cache_dir: str = ARTIFACT_CACHE_DIR, memory_decks: int = ARTIFACT_MEMORY_DECKS,
+                 max_entries: int = ARTIFACT_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.memory_decks = memory_decks
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys: Dict[tuple, str] = {}
+        self.builds = 0
+
+    def key_for(self, file_path: str) -> str:
+        st = os.stat(file_path)
+        stamp = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        if stamp not in self._keys:
+            self._keys[stamp] = self._content_key(file_path)
+        return self._keys[stamp]
+
+    def _content_key(self, file_path: str) -> str:
+        h = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        # Same content rendered under other settings is a different artifact
+        h.update(f"|fmt={ARTIFACT_FORMAT}|dpi={RENDER_DPI}|pages={_max_render_pages()}".encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, artifacts: Dict[str, Any]):
+        self._memory[key] = artifacts
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_decks:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                artifacts = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+            return artifacts
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key: str, artifacts: Dict[str, Any]):
+        path = self._path(key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(artifacts, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[artifacts warn] could not cache {key[:12]}: {type(e).__name__}: {e}")
+            # evict() only counts .json entries, so a stray temp file would never go
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    def get(self, file_path: str) -> Dict[str, Any]:
+        key = self.key_for(file_path)
+        artifacts = self._memory.get(key)
+        if artifacts is None:
+            artifacts = self._load(key)
+            if artifacts is None:
+                artifacts = build_deck_artifacts(file_path)
+                self.builds += 1
+                self._save(key, artifacts)
+        self._remember(key, artifacts)
+        return artifacts
+
+    def evict(self) -> int:
+        """Drop the least recently used artifacts on disk beyond max_entries"""
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        entries.sort(reverse=True)
+        doomed = [p for _mtime, p in entries[self.max_entries:]]
+        for path in doomed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(doomed)
+
+
+artifact_store = ArtifactStore()
+
+
+def get_deck_artifacts(file_path: str) -> Dict[str, Any]:
+    return artifact_store.get(file_path)
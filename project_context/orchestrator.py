@@ -1,18 +1,16 @@
 import os
 import glob
 import asyncio
-from typing import List
+import argparse
+from typing import List, Optional
 from dotenv import load_dotenv
 
 from project_context import ProjectAnalysisContext
-from agents.scoring_agent import ScoringAgent, CombinedAgent
-from agents.feedback_agent import FeedbackAgent
-from agents.image_eval import WorkflowAnalysisAgent
-from utils import load_document_content, display_consolidated_report, display_leaderboard, ALLOWED_EXTS, save_consolidated_reports_to_excel, save_leaderboard_to_excel
-
-async def aload_document_content(file_path: str):
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, load_document_content, file_path)
+from utils import display_consolidated_report, display_leaderboard, ALLOWED_EXTS, save_consolidated_reports_to_excel, save_leaderboard_to_excel
+from result_cache import ResultCache
+from run_journal import RunJournal
+from pipeline import EvaluationPipeline
+from artifacts import artifact_store
 
 def _expand_team_glob(pattern: str) -> List[str]:
     if not pattern:
@@ -26,71 +24,124 @@ def _expand_team_glob(pattern: str) -> List[str]:
     found = [f for f in found if os.path.isfile(f) and os.path.splitext(f)[1].lower() in ALLOWED_EXTS]
     return sorted(set(found))
 
-async def process_file(file_path: str, agent_mode: str, semaphore: asyncio.Semaphore):
-    async with semaphore:
-        print("\n" + "*" * 70)
-        print(f"Processing: {file_path}")
-        print("*" * 70)
-
-        ctx = ProjectAnalysisContext(file_path)
-
-        if not os.path.exists(file_path):
-            ctx.set_error("File not found.")
-            display_consolidated_report(ctx)
-            return ctx
-
-        try:
-            # 1) Load text + quick images for evidence count
-            ctx.raw_text, ctx.images_base64 = await aload_document_content(file_path)
+async def lookup_cached(file_path: str, agent_mode: str, cache: ResultCache):
+    """(cached context or None, cache key, key parts) for one deck"""
+    if not cache.enabled:
+        return None, None, None
+    # Unchanged deck with the same models, prompts and rubric: reuse the earlier results
+    loop = asyncio.get_running_loop()
+    key_parts = await loop.run_in_executor(None, cache.key_parts, file_path, agent_mode)
+    cache_key = cache.key_for_parts(key_parts)
+    return cache.get(cache_key, file_path), cache_key, key_parts
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate hackathon decks matched by TEAM_GLOB.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and do not write the LLM result cache; re-run every agent.")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Continue an earlier run: same decks and mode, skipping decks already journaled.")
+    parser.add_argument("--rebuild-reports", metavar="RUN_ID",
+                        help="Only rewrite the Excel reports from a run's journal, then exit.")
+    return parser.parse_args(argv)
+
+def write_reports(contexts: List[ProjectAnalysisContext]):
+    if not contexts:
+        return
+    display_leaderboard(contexts)
+    # Save all consolidated reports to Excel
+    save_consolidated_reports_to_excel(contexts, "consolidated_reports.xlsx")
+    # Save leaderboard to Excel
+    save_leaderboard_to_excel(contexts, "leaderboard.xlsx")
+
+async def main(argv=None):
+    args = _parse_args(argv)
+    load_dotenv()
 
-            # 2) Diagram summary from images (robust agent)
+    if args.rebuild_reports:
+        journal = RunJournal.open(args.rebuild_reports)
+        contexts = journal.ordered_contexts()
+        print(f"[run {journal.run_id}] rebuilding reports from {len(contexts)} journaled deck(s)")
+        write_reports(contexts)
+        return
+
+    if args.resume:
+        # The deck list and mode are fixed by the run's manifest, not re-read from the env
+        journal = RunJournal.open(args.resume)
+        manifest = journal.manifest()
+        TEAM_FILES, agent_mode = manifest["files"], manifest["agent_mode"]
+    else:
+        pattern = os.getenv("TEAM_GLOB", "").strip()
+        TEAM_FILES = _expand_team_glob(pattern) if pattern else []
+        if not TEAM_FILES:
+            print("No input files found. Set TEAM_GLOB.")
+            raise SystemExit(1)
+        agent_mode = "combined" if os.getenv("USE_COMBINED", "0").lower() in ("1", "true", "yes") else "separate"
+        journal = RunJournal.create(TEAM_FILES, agent_mode)
+
+    done = journal.completed()
+    pending = [fp for fp in TEAM_FILES if fp not in done]
+    print(f"[info] Mode: {agent_mode} | Files: {len(TEAM_FILES)} | Run: {journal.run_id}")
+    if done:
+        print(f"[run {journal.run_id}] resuming: {len(done)} deck(s) already done, {len(pending)} to go")
+
+    cache = ResultCache(enabled=not args.no_cache)
+    if cache.enabled:
+        evicted = cache.evict()
+        print(f"[cache] {cache.cache_dir} (evicted {evicted} stale entries)")
+    else:
+        print("[cache] disabled (--no-cache)")
+    evicted = artifact_store.evict()
+    if evicted:
+        print(f"[artifacts] {artifact_store.cache_dir} (evicted {evicted} stale entries)")
+
+    cache_keys = {}
+
+    async def on_done(ctx: ProjectAnalysisContext):
+        key, key_parts = cache_keys.get(ctx.file_path, (None, None))
+        if key is not None:
             try:
-                img_agent = WorkflowAnalysisAgent()
-                report = img_agent.analyze_workflows(file_path)
-                if report:
-                    ctx.update_workflow_report(report.dict())
+                cache.put(key, ctx, key_parts)
             except Exception as e:
-                print(f"  -> Diagram summary skipped: {e}")
-
-            # 3) Evaluate
-            if agent_mode == "combined":
-                agent = CombinedAgent()
-                await agent.run(ctx)
-            else:
-                scoring = ScoringAgent()
-                feedback = FeedbackAgent()
-                await scoring.run(ctx)
-                await feedback.run(ctx)
-
-        except Exception as e:
-            ctx.set_error(f"Unhandled error: {type(e)._name_}: {e}")
-
-        display_consolidated_report(ctx)
-        return ctx
-
-async def main():
-    load_dotenv()
-    pattern = os.getenv("TEAM_GLOB", "").strip()
-    TEAM_FILES = _expand_team_glob(pattern) if pattern else []
-    if not TEAM_FILES:
-        print("No input files found. Set TEAM_GLOB.")
-        raise SystemExit(1)
-
-    max_concurrency = int(os.getenv("MAX_CONCURRENCY", "2"))
-    semaphore = asyncio.Semaphore(max_concurrency)
-    agent_mode = "combined" if os.getenv("USE_COMBINED", "0").lower() in ("1", "true", "yes") else "separate"
-    print(f"[info] Mode: {agent_mode} | Files: {len(TEAM_FILES)}")
-
-    tasks = [asyncio.create_task(process_file(fp, agent_mode, semaphore)) for fp in TEAM_FILES]
-    results = await asyncio.gather(*tasks, return_exceptions=False)
-    contexts = [r for r in results if r is not None]
-    if contexts:
-        display_leaderboard(contexts)
-        # Save all consolidated reports to Excel
-        save_consolidated_reports_to_excel(contexts, "consolidated_reports.xlsx")
-        # Save leaderboard to Excel
-        save_leaderboard_to_excel(contexts, "leaderboard.xlsx")
-
+                print(f"[cache warn] could not store result: {type(e).__name__}: {e}")
+        # Checkpoint each deck as soon as it finishes
+        journal.record(ctx)
+
+    pipeline = None
+    try:
+        to_evaluate = []
+        for fp in pending:
+            if not os.path.exists(fp):
+                ctx = ProjectAnalysisContext(fp)
+                ctx.set_error("File not found.")
+                display_consolidated_report(ctx)
+                journal.record(ctx)
+                continue
+            cached, key, key_parts = await lookup_cached(fp, agent_mode, cache)
+            if cached is not None:
+                print(f"[cache] hit: {fp}")
+                display_consolidated_report(cached)
+                journal.record(cached)
+                continue
+            cache_keys[fp] = (key, key_parts)
+            to_evaluate.append(fp)
+
+        if to_evaluate:
+            pipeline = EvaluationPipeline(agent_mode, on_done)
+            sizes = " | ".join(f"{k} {v}" for k, v in pipeline.sizes.items())
+            print(f"[pipeline] {len(to_evaluate)} deck(s) | workers: {sizes}")
+            await pipeline.run(to_evaluate)
+    finally:
+        # Also on a crash or Ctrl-C: report whatever the journal holds so far
+        if cache.enabled:
+            print(f"[cache] hits: {cache.hits} | misses: {cache.misses}")
+        if pipeline is not None:
+            print(pipeline.utilization_report())
+        contexts = journal.ordered_contexts(TEAM_FILES)
+        write_reports(contexts)
+        remaining = len(TEAM_FILES) - len(journal.completed())
+        if remaining:
+            print(f"[run {journal.run_id}] {remaining} deck(s) unfinished or failed; "
+                  f"continue with: python orchestrator.py --resume {journal.run_id}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+# pipeline.py
+import os
+import math
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from project_context import ProjectAnalysisContext
+from agents.scoring_agent import ScoringAgent, CombinedAgent
+from agents.feedback_agent import FeedbackAgent
+from agents.image_eval import WorkflowAnalysisAgent, DeckImageExtractor
+from utils import load_document_content, display_consolidated_report
+
+# ---------- Staged evaluation pipeline ----------
+# extract  (process pool)  text + evidence images + vision images per deck
+#    -> bounded queue ->
+# vision   (async, vision RPM)  diagram/workflow report
+#    -> bounded queue ->
+# text     (async, text RPM)  scoring + feedback
+#
+# CPU-heavy rendering runs in worker processes while LLM stages wait on the
+# network, so neither idles behind the other. The bounded queues keep
+# extraction from racing ahead and holding every deck's images in memory.
+# LLM stage widths default to what their rate limit can keep busy (Little's
+# law: RPM x expected call latency / 60); every stage is overridable via env.
+
+LLM_CALL_LATENCY_S = float(os.getenv("LLM_CALL_LATENCY_S", "20"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+
+def _workers_for_rpm(rpm: int) -> int:
+    return max(1, math.ceil(rpm * LLM_CALL_LATENCY_S / 60.0))
+
+
+def stage_sizes() -> Dict[str, int]:
+    cpu_default = os.getenv("MAX_CONCURRENCY", str(min(4, os.cpu_count() or 1)))
+    return {
+        "extract": int(os.getenv("PIPELINE_EXTRACT_WORKERS", cpu_default)),
+        "vision": int(os.getenv("PIPELINE_VISION_WORKERS", str(_workers_for_rpm(int(os.getenv("RATE_LIMIT_RPM_VISION", "6")))))),
+        "text": int(os.getenv("PIPELINE_TEXT_WORKERS", str(_workers_for_rpm(int(os.getenv("RATE_LIMIT_RPM_TEXT", "18")))))),
+    }
+
+
+def _init_extract_worker(render_workers: int):
+    # Split the CPUs between extraction processes instead of each starting a full render pool
+    os.environ.setdefault("RENDER_WORKERS", str(render_workers))
+
+
+def extract_deck(file_path: str) -> Dict[str, Any]:
+    """Process-pool entry point: everything CPU-bound about one deck"""
+    # Both readers share the deck's artifacts; the second is a memory hit
+    raw_text, images_base64 = load_document_content(file_path)
+    try:
+        vision_images = DeckImageExtractor()._extract_images_as_base64(file_path)
+    except Exception as e:
+        print(f"  -> Warning: Could not extract images. {e}")
+        vision_images = []
+    return {"raw_text": raw_text, "images_base64": images_base64, "vision_images": vision_images}
+
+
+class StageStats:
+    """Busy time of one stage's workers, for the end-of-run utilization report"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_s = 0.0
+        self.wait_s = 0.0   # time workers spent blocked on a full downstream queue
+
+    def report_line(self, wall_s: float) -> str:
+        capacity = self.workers * wall_s
+        utilization = (self.busy_s / capacity * 100.0) if capacity > 0 else 0.0
+        avg = self.busy_s / self.items if self.items else 0.0
+        return (f"  {self.name:8s} workers {self.workers:2d} | decks {self.items:4d} | "
+                f"busy {self.busy_s:8.1f}s | avg {avg:6.1f}s/deck | "
+                f"blocked {self.wait_s:7.1f}s | utilization {utilization:5.1f}%")
+
+
+_DONE = object()
+
+
+class EvaluationPipeline:
+    def __init__(self, agent_mode: str, on_done: Callable[[ProjectAnalysisContext], Awaitable[None]],
+                 sizes: Optional[Dict[str, int]] = None):
+        self.agent_mode = agent_mode
+        self.on_done = on_done
+        self.sizes = sizes or stage_sizes()
+        self.stats = {name: StageStats(name, n) for name, n in self.sizes.items()}
+        self._vision_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._text_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.wall_s = 0.0
+
+    async def _hand_off(self, queue: asyncio.Queue, item, stats: StageStats):
+        start = time.perf_counter()
+        await queue.put(item)
+        stats.wait_s += time.perf_counter() - start
+
+    async def _finish(self, ctx: ProjectAnalysisContext):
+        display_consolidated_report(ctx)
+        try:
+            await self.on_done(ctx)
+        except Exception as e:
+            # A dead worker would stall the queues feeding it; report and keep going
+            print(f"[pipeline warn] {ctx.file_path}: completion handler failed: {type(e).__name__}: {e}")
+
+    # -------- stages --------
+    async def _extract_worker(self, files: asyncio.Queue, pool: ProcessPoolExecutor):
+        loop = asyncio.get_running_loop()
+        stats = self.stats["extract"]
+        while True:
+            try:
+                file_path = files.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            print(f"[extract] {file_path}")
+            ctx = ProjectAnalysisContext(file_path)
+            start = time.perf_counter()
+            try:
+                deck = await loop.run_in_executor(pool, extract_deck, file_path)
+            except Exception as e:
+                stats.busy_s += time.perf_counter() - start
+                stats.items += 1
+                ctx.set_error(f"Unhandled error: {type(e).__name__}: {e}")
+                await self._finish(ctx)
+                continue
+            stats.busy_s += time.perf_counter() - start
+            stats.items += 1
+            ctx.raw_text, ctx.images_base64 = deck["raw_text"], deck["images_base64"]
+            await self._hand_off(self._vision_q, (ctx, deck["vision_images"]), stats)
+
+    async def _vision_worker(self):
+        stats = self.stats["vision"]
+        while True:
+            item = await self._vision_q.get()
+            if item is _DONE:
+                return
+            ctx, images = item
+            start = time.perf_counter()
+            try:
+                report = await WorkflowAnalysisAgent().aanalyze_images(images)
+                if report:
+                    ctx.update_workflow_report(report.dict())
+            except Exception as e:
+                print(f"  -> Diagram summary skipped: {e}")
+            stats.busy_s += time.perf_counter() - start
+            stats.items += 1
+            await self._hand_off(self._text_q, ctx, stats)
+
+    async def _text_worker(self):
+        stats = self.stats["text"]
+        while True:
+            ctx = await self._text_q.get()
+            if ctx is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                if self.agent_mode == "combined":
+                    await CombinedAgent().run(ctx)
+                else:
+                    await ScoringAgent().run(ctx)
+                    await FeedbackAgent().run(ctx)
+            except Exception as e:
+                ctx.set_error(f"Unhandled error: {type(e).__name__}: {e}")
+            stats.busy_s += time.perf_counter() - start
+            stats.items += 1
+            await self._finish(ctx)
+
+    async def run(self, files: List[str]):
+        file_q: asyncio.Queue = asyncio.Queue()
+        for fp in files:
+            file_q.put_nowait(fp)
+
+        started = time.perf_counter()
+        render_workers = max(1, (os.cpu_count() or 1) // self.sizes["extract"])
+        pool = ProcessPoolExecutor(max_workers=self.sizes["extract"], initializer=_init_extract_worker,
+                                   initargs=(render_workers,))
+        vision = [asyncio.create_task(self._vision_worker()) for _ in range(self.sizes["vision"])]
+        text = [asyncio.create_task(self._text_worker()) for _ in range(self.sizes["text"])]
+        try:
+            await asyncio.gather(*(self._extract_worker(file_q, pool) for _ in range(self.sizes["extract"])))
+            for _ in vision:
+                await self._vision_q.put(_DONE)
+            await asyncio.gather(*vision)
+            for _ in text:
+                await self._text_q.put(_DONE)
+            await asyncio.gather(*text)
+        finally:
+            for task in vision + text:
+                task.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.wall_s = time.perf_counter() - started
+
+    def utilization_report(self) -> str:
+        lines = [f"######## Pipeline utilization (wall {self.wall_s:.1f}s) ########"]
+        lines += [self.stats[name].report_line(self.wall_s) for name in ("extract", "vision", "text")]
+        return "\n".join(lines)
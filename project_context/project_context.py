@@ -74,3 +74,18 @@ class ProjectAnalysisContext:
 
     def set_error(self, msg: str):
         self.evaluation_error = msg
+
+    # Fields produced by the agents; enough to rebuild reports without re-running them
+    RESULT_FIELDS = ("team_name", "workflow_report", "workflow_report_text", "scores",
+                     "scoring_summary", "workflow_analysis", "feedback", "evaluation_error")
+
+    def to_result_dict(self) -> Dict[str, Any]:
+        return {"file_path": self.file_path, **{k: getattr(self, k) for k in self.RESULT_FIELDS}}
+
+    @classmethod
+    def from_result_dict(cls, data: Dict[str, Any], file_path: Optional[str] = None) -> "ProjectAnalysisContext":
+        ctx = cls(file_path or data["file_path"])
+        for k in cls.RESULT_FIELDS:
+            if k in data:
+                setattr(ctx, k, data[k])
+        return ctx
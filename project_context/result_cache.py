@@ -0,0 +1,140 @@
+# result_cache.py
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Any, Dict, Optional
+
+from project_context import ProjectAnalysisContext
+from agents.scoring_agent import STRICT_RUBRIC, SCORING_PROMPT, COMBINED_PROMPT
+from agents.feedback_agent import FEEDBACK_PROMPT
+from agents.image_eval import WORKFLOW_PROMPT
+from utils import RUBRIC_VERSION, _max_render_pages
+from artifacts import ARTIFACT_FORMAT, RENDER_DPI
+
+# ---------- Content-addressed cache of LLM results ----------
+# One JSON blob per (deck content, models, prompt templates, rubric version,
+# agent mode, render settings) under RESULT_CACHE_DIR. A deck that has not changed since a
+# previous run skips extraction and every LLM call. Eviction is by last use:
+# entries unused for RESULT_CACHE_MAX_AGE_DAYS are dropped, then the least
+# recently used beyond RESULT_CACHE_MAX_ENTRIES.
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(".cache", "results"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2000"))
+RESULT_CACHE_MAX_AGE_DAYS = float(os.getenv("RESULT_CACHE_MAX_AGE_DAYS", "30"))
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def prompt_hash(agent_mode: str) -> str:
+    """Hash of every prompt template the given agent mode sends"""
+    templates = [WORKFLOW_PROMPT, STRICT_RUBRIC]
+    templates += [COMBINED_PROMPT] if agent_mode == "combined" else [SCORING_PROMPT, FEEDBACK_PROMPT]
+    return hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()
+
+
+def model_names() -> Dict[str, str]:
+    """Same env lookups (and defaults) as the agents"""
+    default = os.getenv("OPENAI_MODEL", "gpt-4o")
+    return {
+        "text": os.getenv("OPENAI_MODEL_TEXT", default),
+        "vision": os.getenv("OPENAI_MODEL_VISION", default),
+    }
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR, enabled: bool = True,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES, max_age_days: float = RESULT_CACHE_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_age_s = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key_parts(self, file_path: str, agent_mode: str) -> Dict[str, Any]:
+        return {
+            "deck_sha256": file_sha256(file_path),
+            "models": model_names(),
+            "prompt_sha256": prompt_hash(agent_mode),
+            "rubric_version": RUBRIC_VERSION,
+            "agent_mode": agent_mode,
+            # What the vision model is shown depends on how pages are rendered
+            "render": {"artifact_format": ARTIFACT_FORMAT, "dpi": RENDER_DPI, "max_pages": _max_render_pages()},
+        }
+
+    @staticmethod
+    def key_for_parts(parts: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def key_for(self, file_path: str, agent_mode: str) -> str:
+        return self.key_for_parts(self.key_parts(file_path, agent_mode))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str, file_path: str) -> Optional[ProjectAnalysisContext]:
+        """The cached context for `key` (re-pointed at `file_path`), or None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ProjectAnalysisContext.from_result_dict(entry["result"], file_path=file_path)
+
+    def put(self, key: str, ctx: ProjectAnalysisContext, key_parts: Optional[Dict[str, Any]] = None) -> None:
+        """Store a finished context; failed evaluations are never cached"""
+        if not self.enabled or ctx.evaluation_error:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"key": key, "key_parts": key_parts, "created_at": time.time(), "result": ctx.to_result_dict()}
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def evict(self) -> int:
+        """Drop entries past the max age, then the least recently used beyond max_entries"""
+        if not self.enabled:
+            return 0
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.max_age_s
+        doomed = [p for i, (mtime, p) in enumerate(entries) if mtime < cutoff or i >= self.max_entries]
+        for path in doomed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(doomed)
@@ -0,0 +1,92 @@
+# run_journal.py
+import os
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from project_context import ProjectAnalysisContext
+
+# ---------- Checkpointed batch runs ----------
+# Every run gets a directory under RUNS_DIR holding a manifest (the deck list
+# and agent mode fixed at start) and an append-only journal.jsonl with one
+# line per finished ProjectAnalysisContext, flushed to disk as each deck
+# completes. A crashed or interrupted run is continued with --resume <run-id>,
+# which skips decks already journaled without error, and the Excel reports
+# can be rebuilt from the journal at any point.
+
+RUNS_DIR = os.getenv("RUNS_DIR", "runs")
+
+
+def new_run_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+class RunJournal:
+    def __init__(self, run_id: str, runs_dir: str = RUNS_DIR):
+        self.run_id = run_id
+        self.run_dir = os.path.join(runs_dir, run_id)
+        self.manifest_path = os.path.join(self.run_dir, "run.json")
+        self.journal_path = os.path.join(self.run_dir, "journal.jsonl")
+
+    @classmethod
+    def create(cls, files: List[str], agent_mode: str, runs_dir: str = RUNS_DIR) -> "RunJournal":
+        journal = cls(new_run_id(), runs_dir)
+        os.makedirs(journal.run_dir, exist_ok=True)
+        manifest = {"run_id": journal.run_id, "files": files, "agent_mode": agent_mode, "started_at": time.time()}
+        with open(journal.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return journal
+
+    @classmethod
+    def open(cls, run_id: str, runs_dir: str = RUNS_DIR) -> "RunJournal":
+        journal = cls(run_id, runs_dir)
+        if not os.path.exists(journal.manifest_path):
+            raise FileNotFoundError(f"No run '{run_id}' under {runs_dir}")
+        journal._terminate_torn_line()
+        return journal
+
+    def _terminate_torn_line(self):
+        """After a crash mid-write, end the partial line so the next record starts cleanly"""
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return
+        with open(self.journal_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def manifest(self) -> Dict:
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def record(self, ctx: ProjectAnalysisContext) -> None:
+        """Append one finished deck and force it to disk before moving on"""
+        line = json.dumps({"completed_at": time.time(), "result": ctx.to_result_dict()})
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def contexts(self) -> Dict[str, ProjectAnalysisContext]:
+        """file_path -> latest journaled context; a torn last line (crash mid-write) is ignored"""
+        out: Dict[str, ProjectAnalysisContext] = {}
+        if not os.path.exists(self.journal_path):
+            return out
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)["result"]
+                except (ValueError, KeyError):
+                    continue
+                out[result["file_path"]] = ProjectAnalysisContext.from_result_dict(result)
+        return out
+
+    def completed(self) -> Dict[str, ProjectAnalysisContext]:
+        """Decks that finished without error; a resumed run skips exactly these"""
+        return {fp: ctx for fp, ctx in self.contexts().items() if not ctx.evaluation_error}
+
+    def ordered_contexts(self, files: Optional[List[str]] = None) -> List[ProjectAnalysisContext]:
+        """Journaled contexts in manifest order, for the reports"""
+        by_file = self.contexts()
+        files = files if files is not None else self.manifest()["files"]
+        return [by_file[fp] for fp in files if fp in by_file]
@@ -10,7 +10,9 @@ import tempfile
 import glob as _glob
 import subprocess
 import hashlib
-from typing import List, Tuple, Dict, Any, Optional
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 
 import json
 
@@ -57,6 +59,10 @@ EVAL_ORDER = [
 
 ALLOWED_EXTS = {".pdf", ".pptx", ".ppt"}
 
+# Bump whenever EVAL_WEIGHTS, the calibration below or the rubric text change;
+# it is part of the result cache key, so cached scores are not reused across rubrics
+RUBRIC_VERSION = "2025.1"
+
 def raw_total(scores: dict) -> float:
     return round(sum(float(scores.get(k, 0)) for k in EVAL_WEIGHTS.keys()), 1)
 
@@ -311,25 +317,90 @@ def _to_b64_jpeg(pil_img: Image.Image, quality=85) -> str:
     pil_img.save(buf, format="JPEG", quality=quality)
     return base64.b64encode(buf.getvalue()).decode("utf-8")
 
+def _image_record(pil: Image.Image, **where) -> Dict[str, Any]:
+    """One deck visual: base64 JPEG, perceptual hash, decorative flag and its page/slide index"""
+    return {"b64": _to_b64_jpeg(pil, quality=85), "ph": _phash(pil), "decorative": _is_decorative(pil), **where}
+
 
 # ---------- PDF loaders ----------
-def _render_pdf_pages_to_images(path: str, dpi: int = 150) -> List[Dict[str, Any]]:
-    """Render each PDF page to an image dict with base64 and page_index."""
-    if pdfium is None:
-        return []
+# Pages are rendered (and JPEG-encoded) in a process pool, one contiguous
+# page range per worker, and handed back in page order. Only the first
+# MAX_RENDER_PAGES pages are ever rendered. RENDER_WORKERS=1 renders in-process.
+_render_pool_state = {"pool": None, "workers": 0}
+
+def _max_render_pages() -> int:
+    return int(os.getenv("MAX_RENDER_PAGES", "12"))
+
+def _render_workers() -> int:
+    configured = int(os.getenv("RENDER_WORKERS", "0"))
+    return configured if configured > 0 else min(4, os.cpu_count() or 1)
+
+def _render_pool() -> ProcessPoolExecutor:
+    """Per-process pool of RENDER_WORKERS, created on first use and reused for every deck"""
+    workers = _render_workers()
+    if _render_pool_state["pool"] is None or _render_pool_state["workers"] != workers:
+        if _render_pool_state["pool"] is not None:
+            _render_pool_state["pool"].shutdown(wait=False)
+        _render_pool_state.update(pool=ProcessPoolExecutor(max_workers=workers), workers=workers)
+    return _render_pool_state["pool"]
+
+@atexit.register
+def _shutdown_render_pool():
+    if _render_pool_state["pool"] is not None:
+        _render_pool_state["pool"].shutdown(wait=False, cancel_futures=True)
+
+def _render_pdf_page_range(path: str, start: int, stop: int, dpi: int) -> List[Dict[str, Any]]:
+    """Render pages [start, stop) of one PDF; runs in a render worker"""
     out: List[Dict[str, Any]] = []
     pdf = pdfium.PdfDocument(path)
-    for i in range(len(pdf)):
-        page = pdf[i]
-        pil = page.render(scale=dpi / 72.0).to_pil().convert("RGB")
-        if not _is_decorative(pil):
-            out.append({"b64": _to_b64_jpeg(pil, quality=85), "page_index": i})
+    try:
+        for i in range(start, stop):
+            page = pdf[i]
+            pil = page.render(scale=dpi / 72.0).to_pil().convert("RGB")
+            out.append(_image_record(pil, page_index=i))
+    finally:
+        pdf.close()
     return out
 
-def _extract_pdf_text_and_images(path: str) -> Tuple[str, List[str]]:
-    """Text + visuals for evidence count. Always include page renders to capture vector diagrams."""
+def _iter_pdf_pages_as_images(path: str, dpi: int = 150) -> Iterator[Dict[str, Any]]:
+    """Yield rendered page records in page order as their ranges finish"""
+    if pdfium is None:
+        return
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page_count = len(pdf)
+    finally:
+        pdf.close()
+    max_pages = _max_render_pages()
+    if max_pages > 0:
+        page_count = min(page_count, max_pages)
+    if page_count == 0:
+        return
+
+    ranges = min(_render_workers(), page_count)
+    if ranges <= 1:
+        yield from _render_pdf_page_range(path, 0, page_count, dpi)
+        return
+
+    # One contiguous range per worker, sizes differing by at most one page
+    bounds = [page_count * r // ranges for r in range(ranges + 1)]
+    pool = _render_pool()
+    futures = [pool.submit(_render_pdf_page_range, path, bounds[r], bounds[r + 1], dpi) for r in range(ranges)]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def _render_pdf_pages_to_images(path: str, dpi: int = 150) -> List[Dict[str, Any]]:
+    """Render each PDF page (up to MAX_RENDER_PAGES) to an image dict with base64 and page_index."""
+    return [p for p in _iter_pdf_pages_as_images(path, dpi) if not p["decorative"]]
+
+def _extract_pdf_text_and_embedded(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Page text plus every embedded raster image (with its page_index)."""
     text_parts: List[str] = []
-    images_b64: List[str] = []
+    embedded: List[Dict[str, Any]] = []
     with open(path, "rb") as f:
         reader = pypdf.PdfReader(f)
         for page in reader.pages:
@@ -338,8 +409,8 @@ def _extract_pdf_text_and_images(path: str) -> Tuple[str, List[str]]:
             except Exception as e:
                 print(f"[pdf text warn] {type(e).__name__}")
         # Embedded raster images
-        try:
-            for page in reader.pages:
+        for p_i, page in enumerate(reader.pages):
+            try:
                 if "/Resources" in page and "/XObject" in page["/Resources"]: # pyright: ignore[reportOperatorIssue]
                     xobj = page["/Resources"]["/XObject"].get_object() # pyright: ignore[reportIndexIssue]
                     for obj in xobj:
@@ -347,17 +418,10 @@ def _extract_pdf_text_and_images(path: str) -> Tuple[str, List[str]]:
                         if o.get("/Subtype") == "/Image":
                             data = o.get_data()
                             pil = Image.open(io.BytesIO(data)).convert("RGB")
-                            if not _is_decorative(pil):
-                                images_b64.append(_to_b64_jpeg(pil))
-        except Exception as e:
-            print(f"[pdf img warn] {type(e).__name__}")
-    # Always render pages as well (captures SmartArt/vector)
-    pages = _render_pdf_pages_to_images(path)
-    max_pages = int(os.getenv("MAX_RENDER_PAGES", "12"))
-    if max_pages > 0:
-        pages = pages[:max_pages]
-    images_b64.extend([p["b64"] for p in pages])
-    return "\n".join(text_parts), images_b64
+                            embedded.append(_image_record(pil, page_index=p_i))
+            except Exception as e:
+                print(f"[pdf img warn] {type(e).__name__}")
+    return "\n".join(text_parts), embedded
 
 
 # ---------- PPT/PPTX loaders ----------
@@ -379,8 +443,7 @@ def _render_pptx_slides_windows(path: str) -> List[Dict[str, Any]]:
         for idx, png in enumerate(files):
             try:
                 pil = Image.open(png).convert("RGB")
-                if not _is_decorative(pil):
-                    out.append({"b64": _to_b64_jpeg(pil), "slide_index": idx})
+                out.append(_image_record(pil, slide_index=idx))
             except Exception as e:
                 print(f"[pptx render warn] slide {idx}: {type(e).__name__}")
     except Exception as e:
@@ -412,8 +475,7 @@ def _render_with_soffice(path: str) -> List[Dict[str, Any]]:
         for idx, png in enumerate(files):
             try:
                 pil = Image.open(png).convert("RGB")
-                if not _is_decorative(pil):
-                    out.append({"b64": _to_b64_jpeg(pil), "slide_index": idx})
+                out.append(_image_record(pil, slide_index=idx))
             except Exception as e:
                 print(f"[soffice warn] slide {idx}: {type(e).__name__}")
     except Exception as e:
@@ -422,10 +484,16 @@ def _render_with_soffice(path: str) -> List[Dict[str, Any]]:
         shutil.rmtree(tmpdir, ignore_errors=True)
     return out
 
-def _extract_pptx_text_and_images(path: str) -> Tuple[str, List[str]]:
-    """Text + visuals for evidence count. Always add rendered slides to capture shapes/SmartArt."""
+def _render_pptx_slides(path: str) -> List[Dict[str, Any]]:
+    """Rendered slides (PowerPoint on Windows, LibreOffice elsewhere), capped at MAX_RENDER_PAGES"""
+    rendered = _render_pptx_slides_windows(path) if os.name == "nt" else _render_with_soffice(path)
+    max_pages = _max_render_pages()
+    return rendered[:max_pages] if max_pages > 0 else rendered
+
+def _extract_pptx_text_and_embedded(path: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Shape text plus every picture shape (with its slide_index)."""
     text_parts: List[str] = []
-    images_b64: List[str] = []
+    embedded: List[Dict[str, Any]] = []
     try:
         prs = Presentation(path)
     except Exception as e:
@@ -440,29 +508,29 @@ def _extract_pptx_text_and_images(path: str) -> Tuple[str, List[str]]:
                     except Exception:
                         pass
             for shape in slide.shapes:
-                if getattr(shape, "shape_type", None) == 13 and hasattr(shape, "image"):
+                if hasattr(shape, "image"):
                     try:
                         pil = Image.open(io.BytesIO(shape.image.blob)).convert("RGB")
-                        if not _is_decorative(pil):
-                            images_b64.append(_to_b64_jpeg(pil))
+                        embedded.append(_image_record(pil, slide_index=s_i))
                     except Exception:
                         continue
-    # Always render slides too
-    rendered = _render_pptx_slides_windows(path) if os.name == "nt" else _render_with_soffice(path)
-    max_pages = int(os.getenv("MAX_RENDER_PAGES", "12"))
-    if max_pages > 0:
-        rendered = rendered[:max_pages]
-    images_b64.extend([r["b64"] for r in rendered])
-    return "\n".join(text_parts), images_b64
+    return "\n".join(text_parts), embedded
+
+
+# ---------- Deck content ----------
+def evidence_images(artifacts: Dict[str, Any]) -> List[str]:
+    """Non-decorative embedded images, then non-decorative rendered pages/slides, as base64"""
+    return [d["b64"] for d in artifacts["embedded"] + artifacts["rendered"] if not d["decorative"]]
 
 def load_document_content(file_path: str) -> Tuple[str, List[str]]:
     ext = os.path.splitext(file_path)[1].lower()
     if ext not in ALLOWED_EXTS:
         return "", []
-    if ext == ".pdf":
-        return _extract_pdf_text_and_images(file_path)
-    if ext in (".pptx", ".ppt"):
-        return _extract_pptx_text_and_images(file_path)
+    if ext in (".pdf", ".pptx", ".ppt"):
+        # Rendered once per deck and shared with the vision agent
+        from artifacts import get_deck_artifacts
+        artifacts = get_deck_artifacts(file_path)
+        return artifacts["text"], evidence_images(artifacts)
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             return f.read(), []
@@ -52,8 +52,19 @@ const Dashboard = () => {
       } catch {}
     };
     tick();
-    const id = setInterval(tick, 5000);
-    return () => { mounted = false; clearInterval(id); };
+    // Pushed by the backend on every change; re-fetch after a reconnect or resync
+    const events = new EventSource(`${API_BASE_URL}/events?topics=active_round`);
+    let connectedOnce = false;
+    events.addEventListener("active_round", (e) => {
+      if (mounted) setActiveRound(JSON.parse(e.data).round);
+    });
+    const refetch = () => {
+      if (connectedOnce) tick();
+      connectedOnce = true;
+    };
+    events.addEventListener("hello", refetch);
+    events.addEventListener("resync", refetch);
+    return () => { mounted = false; events.close(); };
   }, []);
 
   if (loading) return <div className="loading-state">Loading Dashboard...</div>;